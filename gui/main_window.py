@@ -27,6 +27,7 @@ from src.auto_enhance import AutoEnhancer
 from src.annotations import AnnotationTools, AnnotationType
 from src.document_compare import DocumentComparator
 from src import constants
+from src import utils
 from gui.edge_adjuster import EdgeAdjusterDialog
 from gui.page_thumbnails import PageThumbnailsWidget
 
@@ -1281,7 +1282,10 @@ class MainWindow(QMainWindow):
         
         if file_path:
             try:
-                self.comparison_image = cv2.imread(file_path)
+                # The comparison is brought to the scanned document's size,
+                # so a large JPEG can be decoded at reduced scale
+                target = max(self.scanned_image.shape[:2]) if self.scanned_image is not None else None
+                self.comparison_image = utils.load_image(file_path, target_max_dim=target)
                 if self.comparison_image is not None:
                     self.btn_compare.setEnabled(True)
                     self.status_label.setText("Comparison document loaded")
@@ -1304,15 +1308,12 @@ class MainWindow(QMainWindow):
             self.status_label.setText("Comparing documents...")
             QApplication.processEvents()
             
-            # Compare documents
-            comparison, differences = self.comparator.compare_documents(
-                self.scanned_image, self.comparison_image
-            )
-            
-            # Calculate similarity
-            similarity = self.comparator.calculate_similarity(
+            # Compare documents (aligns the pair once)
+            result = self.comparator.compare_pair(
                 self.scanned_image, self.comparison_image
             )
+            comparison, differences = result['comparison'], result['differences']
+            similarity = result['similarity']
             
             # Show side-by-side comparison
             side_by_side = self.comparator.compare_side_by_side(
@@ -1323,9 +1324,9 @@ class MainWindow(QMainWindow):
             self.display_image(side_by_side, self.label_processed)
             
             # Show results dialog
-            summary = self.comparator.get_difference_summary(differences)
+            summary = result['summary']
             report = self.comparator.generate_comparison_report(
-                self.scanned_image, self.comparison_image, differences
+                self.scanned_image, self.comparison_image, differences, similarity
             )
             
             from PyQt5.QtWidgets import QTextEdit, QDialog
@@ -303,24 +303,44 @@ class AnnotationTools:
                          thickness: int,
                          dash_length: int = 10):
         """Draw dashed line"""
-        x1, y1 = start
-        x2, y2 = end
-        
-        # Calculate line length
-        length = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        
-        # Calculate number of dashes
-        num_dashes = int(length / (2 * dash_length))
-        
-        for i in range(num_dashes):
-            # Calculate dash start and end
-            t1 = (2 * i * dash_length) / length
-            t2 = ((2 * i + 1) * dash_length) / length
+        x1, y1, x2, y2 = (int(v) for v in (*start, *end))
+
+        if x1 == x2 or y1 == y2:
+            # Axis-aligned: dash endpoints are integer steps along one axis
+            length = abs(x2 - x1) + abs(y2 - y1)
+            num_dashes = length // (2 * dash_length)
+            if num_dashes == 0:
+                return
             
-            dash_start = (int(x1 + t1 * (x2 - x1)), int(y1 + t1 * (y2 - y1)))
-            dash_end = (int(x1 + t2 * (x2 - x1)), int(y1 + t2 * (y2 - y1)))
+            sx = (x2 > x1) - (x2 < x1)
+            sy = (y2 > y1) - (y2 < y1)
+            offsets = np.arange(0, num_dashes * 2 * dash_length, 2 * dash_length)
             
-            cv2.line(image, dash_start, dash_end, color, thickness)
+            segments = np.empty((num_dashes, 2, 2), dtype=np.int32)
+            segments[:, 0, 0] = x1 + sx * offsets
+            segments[:, 0, 1] = y1 + sy * offsets
+            segments[:, 1, 0] = segments[:, 0, 0] + sx * dash_length
+            segments[:, 1, 1] = segments[:, 0, 1] + sy * dash_length
+        else:
+            # Calculate line length
+            length = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+            
+            # Calculate number of dashes
+            num_dashes = int(length / (2 * dash_length))
+            if num_dashes == 0:
+                return
+            
+            # Parametric dash start and end for all dashes at once
+            t1 = (2 * np.arange(num_dashes) * dash_length) / length
+            t2 = t1 + dash_length / length
+            
+            segments = np.empty((num_dashes, 2, 2), dtype=np.int32)
+            segments[:, 0, 0] = x1 + t1 * (x2 - x1)
+            segments[:, 0, 1] = y1 + t1 * (y2 - y1)
+            segments[:, 1, 0] = x1 + t2 * (x2 - x1)
+            segments[:, 1, 1] = y1 + t2 * (y2 - y1)
+        
+        cv2.polylines(image, segments, False, color, thickness)
     
     def add_stamp(self, image: np.ndarray,
                  stamp_type: str,
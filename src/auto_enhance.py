@@ -5,7 +5,7 @@ Automatic cropping, deskewing, and image enhancement
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from scipy import ndimage
 
 
@@ -239,18 +239,22 @@ class AutoEnhancer:
             White balanced image
         """
         # Calculate average for each channel
-        avg = [np.mean(image[:, :, i]) for i in range(3)]
+        avg = cv2.mean(image)[:3]
         
+        return cv2.LUT(image, self._white_balance_lut(avg))
+    
+    def _white_balance_lut(self, avg) -> np.ndarray:
+        """Build a (256, 1, 3) gray-world white balance LUT from channel means"""
         # Calculate gain for each channel
         avg_gray = np.mean(avg)
-        gain = [avg_gray / a for a in avg]
+        values = np.arange(256, dtype=np.float32)
         
-        # Apply gain
-        result = image.copy().astype(np.float32)
+        lut = np.empty((256, 1, 3), dtype=np.uint8)
         for i in range(3):
-            result[:, :, i] = np.clip(result[:, :, i] * gain[i], 0, 255)
+            gain = avg_gray / avg[i] if avg[i] > 0 else 1.0
+            lut[:, 0, i] = np.clip(values * gain, 0, 255)
         
-        return result.astype(np.uint8)
+        return lut
     
     def auto_contrast(self, image: np.ndarray, clip_percent: float = 1.0) -> np.ndarray:
         """
@@ -264,19 +268,25 @@ class AutoEnhancer:
             Contrast-adjusted image
         """
         if len(image.shape) == 3:
-            # Process each channel
-            result = np.zeros_like(image)
-            for i in range(3):
-                result[:, :, i] = self._auto_contrast_channel(image[:, :, i], clip_percent)
-            return result
+            # One LUT per channel, applied in a single pass
+            lut = np.empty((256, 1, 3), dtype=np.uint8)
+            for i, hist in enumerate(self._channel_histograms(image)):
+                lut[:, 0, i] = self._auto_contrast_lut(hist, clip_percent)
+            return cv2.LUT(image, lut)
         else:
-            return self._auto_contrast_channel(image, clip_percent)
+            hist = self._channel_histograms(image)[0]
+            return cv2.LUT(image, self._auto_contrast_lut(hist, clip_percent))
     
-    def _auto_contrast_channel(self, channel: np.ndarray, clip_percent: float) -> np.ndarray:
-        """Auto contrast for single channel"""
-        # Calculate histogram
-        hist, bins = np.histogram(channel.flatten(), 256, [0, 256])
-        
+    @staticmethod
+    def _channel_histograms(image: np.ndarray) -> List[np.ndarray]:
+        """Calculate the 256-bin histogram of each channel"""
+        channels = image.shape[2] if len(image.shape) == 3 else 1
+        return [cv2.calcHist([image], [i], None, [256], [0, 256]).ravel()
+                for i in range(channels)]
+    
+    @staticmethod
+    def _auto_contrast_lut(hist: np.ndarray, clip_percent: float) -> np.ndarray:
+        """Build a 256-entry contrast stretch LUT for a single channel histogram"""
         # Calculate cumulative distribution
         cdf = hist.cumsum()
         cdf_normalized = cdf / cdf[-1]
@@ -288,12 +298,13 @@ class AutoEnhancer:
         low_val = np.searchsorted(cdf_normalized, clip_low)
         high_val = np.searchsorted(cdf_normalized, clip_high)
         
+        values = np.arange(256, dtype=np.float32)
+        
         # Stretch histogram
         if high_val > low_val:
-            result = np.clip((channel.astype(np.float32) - low_val) * (255.0 / (high_val - low_val)), 0, 255)
-            return result.astype(np.uint8)
+            return np.clip((values - low_val) * (255.0 / (high_val - low_val)), 0, 255).astype(np.uint8)
         
-        return channel
+        return values.astype(np.uint8)
     
     def auto_sharpen(self, image: np.ndarray, amount: float = 1.0) -> np.ndarray:
         """
@@ -317,6 +328,35 @@ class AutoEnhancer:
         
         return sharpened
     
+    def _white_balance_contrast_lut(self, image: np.ndarray,
+                                    clip_percent: float = 1.0) -> np.ndarray:
+        """
+        Build a single LUT equivalent to auto_white_balance then auto_contrast
+        
+        The post-white-balance histogram is derived from the input histogram
+        by pushing each bin through the white balance LUT, so the image is
+        only read once to build the tables and once to apply them.
+        
+        Args:
+            image: Input image (BGR)
+            clip_percent: Percentage of pixels to clip at extremes
+            
+        Returns:
+            Composed (256, 1, 3) LUT
+        """
+        hists = self._channel_histograms(image)
+        values = np.arange(256)
+        avg = [np.dot(hist, values) / hist.sum() for hist in hists]
+        wb_lut = self._white_balance_lut(avg)
+        
+        lut = np.empty((256, 1, 3), dtype=np.uint8)
+        for i, hist in enumerate(hists):
+            wb_hist = np.bincount(wb_lut[:, 0, i], weights=hist, minlength=256)
+            contrast_lut = self._auto_contrast_lut(wb_hist, clip_percent)
+            lut[:, 0, i] = contrast_lut[wb_lut[:, 0, i]]
+        
+        return lut
+    
     def enhance_document(self, image: np.ndarray, 
                         deskew: bool = True,
                         crop: bool = True,
@@ -337,9 +377,12 @@ class AutoEnhancer:
             sharpen: Apply sharpening
             
         Returns:
-            Enhanced image
+            Enhanced image. The input is never modified and the result never
+            shares memory with it.
         """
-        result = image.copy()
+        # Every stage allocates its output (or returns its input untouched),
+        # so no defensive copy is needed up front
+        result = image
         
         # Deskew first
         if deskew:
@@ -351,7 +394,12 @@ class AutoEnhancer:
         
         # Color corrections
         if len(result.shape) == 3:
-            if white_balance:
+            if white_balance and auto_contrast and not remove_shadow:
+                # White balance and contrast are both per-channel pointwise
+                # maps, so compose them into a single LUT pass
+                result = cv2.LUT(result, self._white_balance_contrast_lut(result))
+                auto_contrast = False
+            elif white_balance:
                 result = self.auto_white_balance(result)
             
             if remove_shadow:
@@ -365,4 +413,8 @@ class AutoEnhancer:
         if sharpen:
             result = self.auto_sharpen(result, amount=0.5)
         
+        # Deskew/crop may hand back the input or a view into it
+        if np.may_share_memory(result, image):
+            result = result.copy()
+        
         return result
@@ -1,26 +1,137 @@
 """Batch processing functionality for multiple documents"""
 
 import os
-from pathlib import Path
-from typing import List, Optional, Callable, Dict
+import sys
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import List, Optional, Callable, Dict, Tuple
 import cv2
 import numpy as np
 from datetime import datetime
 
+from . import constants
+
+
+# Per-worker BatchProcessor, built once by _init_worker
+_worker = threading.local()
+
+# __slots__ via the dataclass decorator needs Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class BatchItemResult:
+    """Outcome of processing one image"""
+    success: bool
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _cuda_available() -> bool:
+    """Check for a CUDA device and the cv2.cuda modules the batch pipeline uses"""
+    try:
+        return (
+            hasattr(cv2.cuda, 'abs') and hasattr(cv2.cuda, 'cvtColor')
+            and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        )
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _instance_settings(obj) -> Dict:
+    """Instance attributes to copy into a worker's fresh instance (arrays are per-image state)"""
+    return {k: v for k, v in vars(obj).items() if not isinstance(v, np.ndarray)}
+
+
+def _init_worker(scanner_cls, scanner_settings: Dict, processor_cls, processor_settings: Dict,
+                 limit_threads: bool, use_gpu: bool = False):
+    """
+    Build the scanner/processor pair used by a pool worker.
+    
+    Args:
+        scanner_cls: Scanner class to instantiate
+        scanner_settings: Attributes copied from the caller's scanner
+        processor_cls: Image processor class to instantiate
+        processor_settings: Attributes copied from the caller's processor
+        limit_threads: Restrict OpenCV to one thread (process workers only)
+        use_gpu: Run the post-scan adjustments through cv2.cuda
+    """
+    if limit_threads:
+        # The pool already uses every core; keep OpenCV from oversubscribing
+        cv2.setNumThreads(1)
+    scanner = scanner_cls()
+    vars(scanner).update(scanner_settings)
+    processor = processor_cls()
+    vars(processor).update(processor_settings)
+    _worker.batch = BatchProcessor(scanner, processor, max_workers=1, use_gpu=use_gpu)
+
+
+def _write_image(path: str, image: np.ndarray, ext: str) -> bool:
+    """
+    Encode an image in memory and write it with a single open/write/close.
+    
+    Args:
+        path: Output file path
+        image: Image to save
+        ext: File extension selecting the encoder (e.g. '.png')
+        
+    Returns:
+        True if the image was encoded and written
+    """
+    ok, buf = cv2.imencode(ext, image)
+    if not ok:
+        return False
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        data = memoryview(buf).cast('B')
+        while data:
+            # os.write may write less than requested for large buffers
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    
+    return True
+
+
+def _process_one(args: Tuple) -> BatchItemResult:
+    """Process a single image on the current pool worker"""
+    return _worker.batch.process_single_image(*args)
+
 
 class BatchProcessor:
     """Handle batch processing of multiple documents"""
     
-    def __init__(self, scanner, image_processor):
+    def __init__(self, scanner, image_processor, max_workers: Optional[int] = None,
+                 use_gpu: bool = False):
         """
         Initialize batch processor.
         
+        Images are processed in parallel by a pool of worker processes, each
+        with its own instance of the scanner and processor classes. Those
+        instances get a copy of the given instances' attributes (settings
+        such as DocumentScanner.use_gpu), except NumPy arrays, which hold
+        per-image state. With max_workers=1 images are processed
+        sequentially on the given instances.
+        
+        With use_gpu, brightness/contrast and grayscale conversion run on a
+        CUDA device (one upload and one download per image, on a per-worker
+        stream). It silently falls back to the CPU when OpenCV was built
+        without CUDA or no device is present. Workers are threads in that
+        case, so they share the parent's CUDA context.
+        
         Args:
             scanner: DocumentScanner instance
             image_processor: ImageProcessor instance
+            max_workers: Number of parallel workers (defaults to CPU count)
+            use_gpu: Offload per-pixel adjustments to the GPU if available
         """
         self.scanner = scanner
         self.processor = image_processor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_gpu = use_gpu and _cuda_available()
+        self._stream = cv2.cuda.Stream() if self.use_gpu else None
         self.results = []
         
     def process_folder(
@@ -50,13 +161,16 @@ class BatchProcessor:
         Returns:
             Dictionary with success/failure counts and details
         """
-        # Get all image files
-        image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+        # Get all image files (DirEntry caches the file type from the listing)
         image_files = []
-        
-        for file in os.listdir(input_folder):
-            if file.lower().endswith(image_extensions):
-                image_files.append(os.path.join(input_folder, file))
+        with os.scandir(input_folder) as entries:
+            for entry in entries:
+                name = entry.name
+                dot = name.rfind('.')
+                # dot > 0 skips extensionless names and dotfiles, like splitext
+                if dot > 0 and name[dot:].lower() in constants.SUPPORTED_IMAGE_FORMATS \
+                        and entry.is_file():
+                    image_files.append(entry.path)
         
         if not image_files:
             return {
@@ -71,56 +185,121 @@ class BatchProcessor:
         os.makedirs(output_folder, exist_ok=True)
         
         # Process each image
-        results = {
-            'success': 0,
-            'failed': 0,
+        details, success, failed = self._run_batch(
+            image_files,
+            progress_callback,
+            (output_folder, color_mode, output_format, auto_enhance, brightness, contrast)
+        )
+        
+        return {
+            'success': success,
+            'failed': failed,
             'total': len(image_files),
-            'details': []
+            'details': details
         }
+    
+    def _run_batch(
+        self,
+        image_paths: List[str],
+        progress_callback: Optional[Callable],
+        options: Tuple
+    ) -> Tuple[List[Dict], int, int]:
+        """
+        Process images in parallel and collect per-file details.
         
-        for i, image_path in enumerate(image_files):
-            filename = os.path.basename(image_path)
-            
-            # Update progress
-            if progress_callback:
-                progress_callback(i + 1, len(image_files), filename)
+        Args:
+            image_paths: List of image file paths
+            progress_callback: Function to call with progress updates (done, total, filename)
+            options: process_single_image arguments between image_path and batch_ts
             
-            try:
-                # Process single image
-                result = self.process_single_image(
-                    image_path,
-                    output_folder,
-                    color_mode,
-                    output_format,
-                    auto_enhance,
-                    brightness,
-                    contrast
-                )
-                
-                if result['success']:
-                    results['success'] += 1
-                    results['details'].append({
-                        'filename': filename,
-                        'status': 'success',
-                        'output': result['output_path']
-                    })
-                else:
-                    results['failed'] += 1
-                    results['details'].append({
-                        'filename': filename,
-                        'status': 'failed',
-                        'error': result.get('error', 'Unknown error')
-                    })
-                    
-            except Exception as e:
-                results['failed'] += 1
-                results['details'].append({
+        Returns:
+            Tuple of (details in input order, success count, failure count)
+        """
+        total = len(image_paths)
+        filenames = [os.path.basename(path) for path in image_paths]
+        details = [None] * total
+        
+        # One timestamp per batch; the per-file index keeps names unique
+        batch_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        def record(index: int, result: BatchItemResult):
+            # Details stay plain dicts, as returned by process_folder
+            filename = filenames[index]
+            if result.success:
+                details[index] = {
+                    'filename': filename,
+                    'status': 'success',
+                    'output': result.output_path
+                }
+            else:
+                details[index] = {
                     'filename': filename,
                     'status': 'failed',
-                    'error': str(e)
-                })
+                    'error': result.error or 'Unknown error'
+                }
         
-        return results
+        workers = min(self.max_workers, total)
+        
+        if workers <= 1:
+            for i, image_path in enumerate(image_paths):
+                if progress_callback:
+                    progress_callback(i + 1, total, filenames[i])
+                
+                try:
+                    record(i, self.process_single_image(image_path, *options, batch_ts, i))
+                except Exception as e:
+                    record(i, BatchItemResult(False, error=str(e)))
+        else:
+            initargs = (
+                type(self.scanner), _instance_settings(self.scanner),
+                type(self.processor), _instance_settings(self.processor)
+            )
+            executor = None
+            if not self.use_gpu:
+                # CUDA contexts do not survive fork, so GPU batches use threads
+                try:
+                    executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_init_worker,
+                        initargs=initargs + (True, False)
+                    )
+                except (OSError, NotImplementedError):
+                    # No multiprocessing support on this platform
+                    pass
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=initargs + (False, self.use_gpu)
+                )
+            
+            with executor:
+                futures = {
+                    executor.submit(_process_one, (image_path,) + options + (batch_ts, i)): i
+                    for i, image_path in enumerate(image_paths)
+                }
+                
+                # Progress is reported from this (the caller's) thread as results
+                # arrive, so workers never wait on the callback and GUI
+                # callbacks stay on the GUI thread
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        i = futures[future]
+                        try:
+                            record(i, future.result())
+                        except Exception as e:
+                            record(i, BatchItemResult(False, error=str(e)))
+                        
+                        if progress_callback:
+                            progress_callback(done, total, filenames[i])
+                except BaseException:
+                    # Callback aborted the batch: drop work that has not started
+                    for future in futures:
+                        future.cancel()
+                    raise
+        
+        success = sum(1 for d in details if d['status'] == 'success')
+        return details, success, len(details) - success
     
     def process_single_image(
         self,
@@ -130,8 +309,10 @@ class BatchProcessor:
         output_format: str = 'pdf',
         auto_enhance: bool = False,
         brightness: int = 0,
-        contrast: int = 0
-    ) -> Dict:
+        contrast: int = 0,
+        batch_ts: Optional[str] = None,
+        seq: Optional[int] = None
+    ) -> BatchItemResult:
         """
         Process a single image.
         
@@ -143,70 +324,111 @@ class BatchProcessor:
             auto_enhance: Apply auto enhancement
             brightness: Brightness adjustment
             contrast: Contrast adjustment
+            batch_ts: Timestamp shared by the whole batch (defaults to now)
+            seq: Index of the image within its batch, appended to the filename
             
         Returns:
-            Dictionary with processing result
+            BatchItemResult with the output path or the error message
         """
         try:
             # Load image
             if not self.scanner.load_image(image_path):
-                return {
-                    'success': False,
-                    'error': 'Failed to load image'
-                }
+                return BatchItemResult(False, error='Failed to load image')
             
             # Scan document
             scanned = self.scanner.scan_document()
             
             if scanned is None:
-                return {
-                    'success': False,
-                    'error': 'Could not detect document'
-                }
+                return BatchItemResult(False, error='Could not detect document')
             
-            # Apply enhancements
-            result = scanned.copy()
+            # Apply enhancements (every step allocates its output, so the
+            # scanned image is never modified in place)
+            result = scanned
+            
+            # Track the pixel layout so no-op conversions can be skipped
+            current_mode = 'color' if result.ndim == 3 else 'grayscale'
             
             # Auto enhance
             if auto_enhance:
+                # Document mode ends in adaptive thresholding
                 result = self.processor.auto_enhance(result, mode='document')
+                current_mode = 'bw'
+            
+            adjust = brightness != 0 or contrast != 0
             
-            # Brightness/Contrast
-            if brightness != 0 or contrast != 0:
-                result = self.processor.adjust_brightness_contrast(
-                    result, brightness, contrast
+            if self.use_gpu and (adjust or (color_mode == 'grayscale' and current_mode == 'color')):
+                # Brightness/contrast and grayscale conversion in one device round trip
+                to_gray = color_mode == 'grayscale' and current_mode == 'color'
+                result = self._adjust_on_gpu(result, brightness, contrast, to_gray)
+                if to_gray or (adjust and current_mode == 'bw'):
+                    current_mode = 'grayscale'
+            
+            # Brightness/Contrast, in uint8 with saturating arithmetic
+            # (the same formula as ImageProcessor.adjust_brightness_contrast)
+            elif adjust:
+                result = cv2.convertScaleAbs(
+                    result, alpha=1.0 + contrast / 100.0, beta=float(brightness)
                 )
+                if current_mode == 'bw':
+                    # Shifted levels are no longer strictly binary
+                    current_mode = 'grayscale'
             
             # Color mode
             if color_mode == 'bw':
-                result = self.processor.convert_to_bw(result)
+                if current_mode != 'bw':
+                    result = self.processor.convert_to_bw(result)
             elif color_mode == 'grayscale':
-                if len(result.shape) == 3:
+                if current_mode == 'color':
                     result = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
             
             # Generate output filename
-            input_filename = Path(image_path).stem
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"{input_filename}_scanned_{timestamp}.{output_format}"
+            input_filename = os.path.splitext(os.path.basename(image_path))[0]
+            timestamp = batch_ts or datetime.now().strftime("%Y%m%d_%H%M%S")
+            if seq is None:
+                output_filename = f"{input_filename}_scanned_{timestamp}.{output_format}"
+            else:
+                output_filename = f"{input_filename}_scanned_{timestamp}_{seq:05d}.{output_format}"
             output_path = os.path.join(output_folder, output_filename)
             
             # Save result
-            if cv2.imwrite(output_path, result):
-                return {
-                    'success': True,
-                    'output_path': output_path
-                }
+            if _write_image(output_path, result, '.' + output_format):
+                return BatchItemResult(True, output_path=output_path)
             else:
-                return {
-                    'success': False,
-                    'error': 'Failed to save image'
-                }
+                return BatchItemResult(False, error='Failed to save image')
                 
         except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            return BatchItemResult(False, error=str(e))
+    
+    def _adjust_on_gpu(self, image: np.ndarray, brightness: int, contrast: int,
+                       to_gray: bool) -> np.ndarray:
+        """
+        Apply brightness/contrast and grayscale conversion on the GPU.
+        
+        Args:
+            image: Input image
+            brightness: Brightness adjustment (-100 to 100)
+            contrast: Contrast adjustment (-100 to 100)
+            to_gray: Convert a BGR image to grayscale after adjusting
+            
+        Returns:
+            Adjusted image (downloaded to host memory)
+        """
+        stream = self._stream
+        gpu = cv2.cuda_GpuMat()
+        gpu.upload(image, stream)
+        
+        if brightness != 0 or contrast != 0:
+            # Same arithmetic as ImageProcessor.adjust_brightness_contrast,
+            # i.e. convertScaleAbs: saturate(|x * alpha + beta|)
+            scaled = gpu.convertTo(cv2.CV_32F, 1 + contrast / 100.0, brightness, stream)
+            gpu = cv2.cuda.abs(scaled, stream=stream).convertTo(cv2.CV_8U, stream)
+        
+        if to_gray:
+            gpu = cv2.cuda.cvtColor(gpu, cv2.COLOR_BGR2GRAY, stream=stream)
+        
+        result = gpu.download(stream)
+        stream.waitForCompletion()
+        return result
     
     def process_multiple_files(
         self,
@@ -239,59 +461,24 @@ class BatchProcessor:
         """
         os.makedirs(output_folder, exist_ok=True)
         
+        details, success, failed = self._run_batch(
+            image_paths,
+            progress_callback,
+            (output_folder, color_mode, output_format, auto_enhance, brightness, contrast)
+        )
+        
         results = {
-            'success': 0,
-            'failed': 0,
+            'success': success,
+            'failed': failed,
             'total': len(image_paths),
-            'details': [],
+            'details': details,
             'combined_pdf': None
         }
         
         processed_images = []
-        
-        for i, image_path in enumerate(image_paths):
-            filename = os.path.basename(image_path)
-            
-            if progress_callback:
-                progress_callback(i + 1, len(image_paths), filename)
-            
-            try:
-                result = self.process_single_image(
-                    image_path,
-                    output_folder,
-                    color_mode,
-                    output_format,
-                    auto_enhance,
-                    brightness,
-                    contrast
-                )
-                
-                if result['success']:
-                    results['success'] += 1
-                    results['details'].append({
-                        'filename': filename,
-                        'status': 'success',
-                        'output': result['output_path']
-                    })
-                    
-                    if combine_pdf and output_format.lower() == 'pdf':
-                        # Store for combining later
-                        processed_images.append(result['output_path'])
-                else:
-                    results['failed'] += 1
-                    results['details'].append({
-                        'filename': filename,
-                        'status': 'failed',
-                        'error': result.get('error', 'Unknown error')
-                    })
-                    
-            except Exception as e:
-                results['failed'] += 1
-                results['details'].append({
-                    'filename': filename,
-                    'status': 'failed',
-                    'error': str(e)
-                })
+        if combine_pdf and output_format.lower() == 'pdf':
+            # Store for combining later
+            processed_images = [d['output'] for d in details if d['status'] == 'success']
         
         # Combine PDFs if requested (note: basic implementation, may need PyPDF2 for full support)
         if combine_pdf and processed_images and output_format.lower() == 'pdf':
@@ -14,6 +14,8 @@ DEFAULT_CANNY_THRESHOLD1 = 50
 DEFAULT_CANNY_THRESHOLD2 = 150
 MIN_DOCUMENT_AREA = 10000
 APPROX_EPSILON_FACTOR = 0.02
+DESKEW_MAX_DIMENSION = 1024  # Line detection size for deskewing
+HOUGH_MAX_DIMENSION = 750  # Working size for Hough-based document detection
 
 # Resize settings for preview
 MAX_PREVIEW_WIDTH = 800
@@ -31,7 +33,7 @@ FORMAT_PNG = 'png'
 FORMAT_TIFF = 'tiff'
 
 # File extensions
-SUPPORTED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+SUPPORTED_IMAGE_FORMATS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'})
 
 # GUI constants
 WINDOW_WIDTH = 1200
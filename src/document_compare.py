@@ -5,7 +5,8 @@ Compare two versions of a document and highlight differences
 
 import cv2
 import numpy as np
-from typing import Tuple, List, Dict, Optional
+from typing import Tuple, List, Dict, Optional, Iterator
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 
@@ -33,9 +34,23 @@ class DocumentComparator:
         """Initialize document comparator"""
         self.threshold_sensitivity = 30  # Difference sensitivity (0-255)
         self.min_contour_area = 100  # Minimum area for difference region
+        
+        # Feature detector and per-image keypoint cache, reused across calls.
+        # Entries are keyed by image buffer, so documents must not be
+        # modified in place between comparisons (or call clear_feature_cache).
+        self._orb = cv2.ORB_create(1000, scaleFactor=1.2, nlevels=6)
+        self.align_max_dimension = 1024  # Features are detected at this size
+        self._feature_cache: Dict[Tuple, Tuple] = {}
+        self._feature_cache_size = 4
+        
+        # Scratch buffers for the difference/threshold images, reused while
+        # the document size stays the same (instances are not thread-safe)
+        self._diff_buf: Optional[np.ndarray] = None
+        self._thresh_buf: Optional[np.ndarray] = None
     
     def compare_documents(self, doc1: np.ndarray, doc2: np.ndarray,
-                         highlight_color: Tuple[int, int, int] = (0, 0, 255)) -> Tuple[np.ndarray, List[Difference]]:
+                         highlight_color: Tuple[int, int, int] = (0, 0, 255),
+                         inplace: bool = False) -> Tuple[np.ndarray, List[Difference]]:
         """
         Compare two document images and highlight differences
         
@@ -43,59 +58,135 @@ class DocumentComparator:
             doc1: First document (original)
             doc2: Second document (modified)
             highlight_color: Color for highlighting differences (BGR)
+            inplace: Allow drawing onto doc2 itself when no alignment
+                     was applied, instead of copying it first
             
         Returns:
             Tuple of (comparison image, list of differences)
         """
-        # Align documents first
-        doc2_aligned = self._align_documents(doc1, doc2)
-        
-        # Resize to match if needed
-        if doc1.shape != doc2_aligned.shape:
-            doc2_aligned = cv2.resize(doc2_aligned, (doc1.shape[1], doc1.shape[0]))
+        doc2_aligned = self._prepare_pair(doc1, doc2)
         
         # Convert to grayscale
-        gray1 = cv2.cvtColor(doc1, cv2.COLOR_BGR2GRAY) if len(doc1.shape) == 3 else doc1
-        gray2 = cv2.cvtColor(doc2_aligned, cv2.COLOR_BGR2GRAY) if len(doc2_aligned.shape) == 3 else doc2_aligned
+        gray1 = self._to_gray(doc1)
+        gray2 = self._to_gray(doc2_aligned)
         
         # Calculate difference
-        diff = cv2.absdiff(gray1, gray2)
+        diff = self._absdiff(gray1, gray2)
         
-        # Threshold to find significant differences
-        _, thresh = cv2.threshold(diff, self.threshold_sensitivity, 255, cv2.THRESH_BINARY)
+        return self._highlight_differences(
+            gray1, gray2, diff, doc2, doc2_aligned, highlight_color, inplace
+        )
+    
+    def compare_pair(self, doc1: np.ndarray, doc2: np.ndarray,
+                     highlight_color: Tuple[int, int, int] = (0, 0, 255),
+                     colormap: int = cv2.COLORMAP_JET,
+                     inplace: bool = False) -> Dict:
+        """
+        Run a full comparison, aligning the documents only once
         
-        # Find contours of differences
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        Equivalent to calling compare_documents, create_diff_map and
+        calculate_similarity on the same pair, without repeating the
+        feature matching and homography for each of them.
         
-        # Create comparison image
-        comparison = doc2_aligned.copy()
-        if len(comparison.shape) == 2:
-            comparison = cv2.cvtColor(comparison, cv2.COLOR_GRAY2BGR)
+        Args:
+            doc1: First document (original)
+            doc2: Second document (modified)
+            highlight_color: Color for highlighting differences (BGR)
+            colormap: OpenCV colormap for the difference map
+            inplace: Allow drawing onto doc2 itself when no alignment
+                     was applied, instead of copying it first
+            
+        Returns:
+            Dictionary with 'aligned', 'comparison', 'differences',
+            'diff_map', 'similarity' and 'summary'
+        """
+        doc2_aligned = self._prepare_pair(doc1, doc2)
+        
+        gray1 = self._to_gray(doc1)
+        gray2 = self._to_gray(doc2_aligned)
+        diff = self._absdiff(gray1, gray2)
+        
+        comparison, differences = self._highlight_differences(
+            gray1, gray2, diff, doc2, doc2_aligned, highlight_color, inplace
+        )
+        
+        return {
+            'aligned': doc2_aligned,
+            'comparison': comparison,
+            'differences': differences,
+            'diff_map': cv2.applyColorMap(diff, colormap),
+            'similarity': self._similarity(gray1, gray2),
+            'summary': self.get_difference_summary(differences)
+        }
+    
+    def _highlight_differences(self, gray1: np.ndarray, gray2: np.ndarray,
+                               diff: np.ndarray, doc2: np.ndarray, doc2_aligned: np.ndarray,
+                               highlight_color: Tuple[int, int, int],
+                               inplace: bool = False) -> Tuple[np.ndarray, List[Difference]]:
+        """
+        Find difference regions and draw them onto the aligned document
+        
+        Args:
+            gray1: First document (grayscale)
+            gray2: Aligned second document (grayscale)
+            diff: Absolute difference of gray1 and gray2
+            doc2: Second document as passed by the caller
+            doc2_aligned: Aligned second document
+            highlight_color: Color for highlighting differences (BGR)
+            inplace: Allow drawing onto doc2 when doc2_aligned is doc2
+            
+        Returns:
+            Tuple of (comparison image, list of differences)
+        """
+        # Threshold to find significant differences
+        if self._thresh_buf is None or self._thresh_buf.shape != diff.shape:
+            self._thresh_buf = np.empty_like(diff)
+        _, thresh = cv2.threshold(diff, self.threshold_sensitivity, 255, cv2.THRESH_BINARY,
+                                  dst=self._thresh_buf)
+        
+        # Find connected regions of differences, with boxes and areas in one pass
+        _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+        
+        # Create comparison image. A warped or resized document is already a
+        # fresh array; only the caller's own doc2 needs protecting.
+        if len(doc2_aligned.shape) == 2:
+            comparison = cv2.cvtColor(doc2_aligned, cv2.COLOR_GRAY2BGR)
+        elif inplace or not np.may_share_memory(doc2_aligned, doc2):
+            comparison = doc2_aligned
+        else:
+            comparison = doc2_aligned.copy()
+        
+        # Skip the background label and regions that are too small
+        stats = stats[1:]
+        boxes = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_contour_area][
+            :, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP, cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]
+        ]
         
         differences = []
         
+        if len(boxes) == 0:
+            return comparison, differences
+        
+        # Region means come from integral images in O(1) per box
+        means1, means2, mean_diff = self._box_means(
+            [cv2.integral(img, sdepth=cv2.CV_64F) for img in (gray1, gray2, diff)], boxes
+        )
+        
+        # Confidence is based on difference intensity
+        confidences = mean_diff / 255.0
+        diff_types = self._classify_differences(means1, means2)
+        
         # Highlight differences
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area >= self.min_contour_area:
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Draw rectangle around difference
-                cv2.rectangle(comparison, (x, y), (x + w, y + h), highlight_color, 2)
-                
-                # Calculate confidence (based on difference intensity)
-                roi_diff = diff[y:y+h, x:x+w]
-                confidence = np.mean(roi_diff) / 255.0
-                
-                # Determine type of difference
-                diff_type = self._classify_difference(gray1[y:y+h, x:x+w], gray2[y:y+h, x:x+w])
-                
-                differences.append(Difference(
-                    type=diff_type,
-                    region=(x, y, w, h),
-                    confidence=confidence,
-                    description=f"{diff_type.value.capitalize()} content at ({x}, {y})"
-                ))
+        for (x, y, w, h), confidence, diff_type in zip(boxes.tolist(), confidences.tolist(), diff_types):
+            # Draw rectangle around difference
+            cv2.rectangle(comparison, (x, y), (x + w, y + h), highlight_color, 2)
+            
+            differences.append(Difference(
+                type=diff_type,
+                region=(x, y, w, h),
+                confidence=confidence,
+                description=f"{diff_type.value.capitalize()} content at ({x}, {y})"
+            ))
         
         return comparison, differences
     
@@ -121,14 +212,10 @@ class DocumentComparator:
         target_height = max(h1, h2)
         
         if h1 != target_height:
-            scale = target_height / h1
-            doc1 = cv2.resize(doc1, None, fx=scale, fy=scale)
-            w1 = int(w1 * scale)
+            doc1 = cv2.resize(doc1, (int(w1 * target_height / h1), target_height))
         
         if h2 != target_height:
-            scale = target_height / h2
-            doc2 = cv2.resize(doc2, None, fx=scale, fy=scale)
-            w2 = int(w2 * scale)
+            doc2 = cv2.resize(doc2, (int(w2 * target_height / h2), target_height))
         
         # Convert to BGR if grayscale
         if len(doc1.shape) == 2:
@@ -140,22 +227,21 @@ class DocumentComparator:
         font = cv2.FONT_HERSHEY_SIMPLEX
         label_height = 40
         
-        # Create labeled images
-        labeled1 = np.ones((target_height + label_height, w1, 3), dtype=np.uint8) * 255
-        labeled2 = np.ones((target_height + label_height, w2, 3), dtype=np.uint8) * 255
-        
-        labeled1[label_height:, :] = doc1
-        labeled2[label_height:, :] = doc2
+        # Create labeled images with a white strip on top
+        labeled1 = cv2.copyMakeBorder(doc1, label_height, 0, 0, 0,
+                                      cv2.BORDER_CONSTANT, value=(255, 255, 255))
+        labeled2 = cv2.copyMakeBorder(doc2, label_height, 0, 0, 0,
+                                      cv2.BORDER_CONSTANT, value=(255, 255, 255))
         
         # Add text labels
         cv2.putText(labeled1, label1, (10, 25), font, 0.8, (0, 0, 0), 2)
         cv2.putText(labeled2, label2, (10, 25), font, 0.8, (0, 0, 0), 2)
         
         # Add dividing line
-        divider = np.ones((target_height + label_height, 2, 3), dtype=np.uint8) * 128
+        divider = np.full((target_height + label_height, 2, 3), 128, dtype=np.uint8)
         
         # Concatenate
-        result = np.hstack([labeled1, divider, labeled2])
+        result = cv2.hconcat([labeled1, divider, labeled2])
         
         return result
     
@@ -172,19 +258,14 @@ class DocumentComparator:
         Returns:
             Difference map image
         """
-        # Align documents
-        doc2_aligned = self._align_documents(doc1, doc2)
-        
-        # Resize to match
-        if doc1.shape != doc2_aligned.shape:
-            doc2_aligned = cv2.resize(doc2_aligned, (doc1.shape[1], doc1.shape[0]))
+        doc2_aligned = self._prepare_pair(doc1, doc2)
         
         # Convert to grayscale
-        gray1 = cv2.cvtColor(doc1, cv2.COLOR_BGR2GRAY) if len(doc1.shape) == 3 else doc1
-        gray2 = cv2.cvtColor(doc2_aligned, cv2.COLOR_BGR2GRAY) if len(doc2_aligned.shape) == 3 else doc2_aligned
+        gray1 = self._to_gray(doc1)
+        gray2 = self._to_gray(doc2_aligned)
         
         # Calculate absolute difference
-        diff = cv2.absdiff(gray1, gray2)
+        diff = self._absdiff(gray1, gray2)
         
         # Apply colormap
         diff_colored = cv2.applyColorMap(diff, colormap)
@@ -202,20 +283,61 @@ class DocumentComparator:
         Returns:
             Similarity percentage (0.0 to 100.0)
         """
-        # Align and resize
-        doc2_aligned = self._align_documents(doc1, doc2)
-        if doc1.shape != doc2_aligned.shape:
-            doc2_aligned = cv2.resize(doc2_aligned, (doc1.shape[1], doc1.shape[0]))
+        doc2_aligned = self._prepare_pair(doc1, doc2)
         
         # Convert to grayscale
-        gray1 = cv2.cvtColor(doc1, cv2.COLOR_BGR2GRAY) if len(doc1.shape) == 3 else doc1
-        gray2 = cv2.cvtColor(doc2_aligned, cv2.COLOR_BGR2GRAY) if len(doc2_aligned.shape) == 3 else doc2_aligned
+        gray1 = self._to_gray(doc1)
+        gray2 = self._to_gray(doc2_aligned)
+        
+        return self._similarity(gray1, gray2)
+    
+    def _similarity(self, gray1: np.ndarray, gray2: np.ndarray) -> float:
+        """SSIM (Structural Similarity Index) of two aligned grayscale documents, in percent"""
+        return self._ssim_cv2(gray1, gray2) * 100.0
+    
+    @staticmethod
+    def _ssim_cv2(a: np.ndarray, b: np.ndarray, win_size: int = 7) -> float:
+        """
+        Mean SSIM computed with OpenCV box filters
         
-        # Calculate SSIM (Structural Similarity Index)
-        from skimage.metrics import structural_similarity as ssim
-        similarity = ssim(gray1, gray2)
+        Follows skimage.metrics.structural_similarity defaults (uniform
+        window, sample covariance, 8-bit data range, border cropped), so
+        scores match the previous implementation to float32 precision.
         
-        return similarity * 100.0
+        Args:
+            a: First grayscale image (uint8)
+            b: Second grayscale image (uint8), same shape as a
+            win_size: Side length of the sliding window
+            
+        Returns:
+            Mean SSIM in [-1, 1]
+        """
+        a = a.astype(np.float32)
+        b = b.astype(np.float32)
+        ksize = (win_size, win_size)
+        
+        mu_a = cv2.boxFilter(a, -1, ksize)
+        mu_b = cv2.boxFilter(b, -1, ksize)
+        mu_aa = cv2.boxFilter(a * a, -1, ksize)
+        mu_bb = cv2.boxFilter(b * b, -1, ksize)
+        mu_ab = cv2.boxFilter(a * b, -1, ksize)
+        
+        # Unbiased (sample) variances, as skimage does by default
+        n = win_size * win_size
+        cov_norm = n / (n - 1.0)
+        var_a = cov_norm * (mu_aa - mu_a * mu_a)
+        var_b = cov_norm * (mu_bb - mu_b * mu_b)
+        cov_ab = cov_norm * (mu_ab - mu_a * mu_b)
+        
+        c1 = (0.01 * 255) ** 2
+        c2 = (0.03 * 255) ** 2
+        
+        ssim_map = ((2 * mu_a * mu_b + c1) * (2 * cov_ab + c2)) / \
+                   ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2))
+        
+        # Ignore the border, where the window runs off the image
+        pad = (win_size - 1) // 2
+        return float(ssim_map[pad:-pad, pad:-pad].mean(dtype=np.float64))
     
     def get_difference_summary(self, differences: List[Difference]) -> Dict:
         """
@@ -236,11 +358,13 @@ class DocumentComparator:
                 'avg_confidence': 0.0
             }
         
+        counts = Counter(d.type for d in differences)
+        
         summary = {
             'total': len(differences),
-            'added': sum(1 for d in differences if d.type == DifferenceType.ADDED),
-            'removed': sum(1 for d in differences if d.type == DifferenceType.REMOVED),
-            'modified': sum(1 for d in differences if d.type == DifferenceType.MODIFIED),
+            'added': counts[DifferenceType.ADDED],
+            'removed': counts[DifferenceType.REMOVED],
+            'modified': counts[DifferenceType.MODIFIED],
             'avg_confidence': sum(d.confidence for d in differences) / len(differences)
         }
         
@@ -276,28 +400,31 @@ class DocumentComparator:
         
         return result
     
-    def create_blink_comparison(self, doc1: np.ndarray, doc2: np.ndarray) -> List[np.ndarray]:
+    def create_blink_comparison(self, doc1: np.ndarray, doc2: np.ndarray,
+                                copy: bool = False) -> Iterator[np.ndarray]:
         """
         Create frames for blink comparison (alternating between documents)
         
+        Alignment happens when this is called; frames are produced lazily.
+        Without copy, every frame is a reference to doc1 or the aligned doc2,
+        so drawing on one frame shows up in every other frame of that document.
+        
         Args:
             doc1: First document
             doc2: Second document
+            copy: Yield an independent copy for each frame
             
         Returns:
-            List of frames [doc1, doc2, doc1, doc2, ...]
+            Iterator over 10 frames: doc1, doc2, doc1, doc2, ...
         """
-        # Align and resize
-        doc2_aligned = self._align_documents(doc1, doc2)
-        if doc1.shape != doc2_aligned.shape:
-            doc2_aligned = cv2.resize(doc2_aligned, (doc1.shape[1], doc1.shape[0]))
+        doc2_aligned = self._prepare_pair(doc1, doc2)
         
-        # Create 10 alternating frames
-        frames = []
-        for i in range(10):
-            frames.append(doc1 if i % 2 == 0 else doc2_aligned)
+        def frames():
+            for i in range(10):
+                frame = doc1 if i % 2 == 0 else doc2_aligned
+                yield frame.copy() if copy else frame
         
-        return frames
+        return frames()
     
     def _align_documents(self, doc1: np.ndarray, doc2: np.ndarray) -> np.ndarray:
         """
@@ -311,14 +438,9 @@ class DocumentComparator:
             Aligned document
         """
         try:
-            # Convert to grayscale
-            gray1 = cv2.cvtColor(doc1, cv2.COLOR_BGR2GRAY) if len(doc1.shape) == 3 else doc1
-            gray2 = cv2.cvtColor(doc2, cv2.COLOR_BGR2GRAY) if len(doc2.shape) == 3 else doc2
-            
             # Detect ORB features
-            orb = cv2.ORB_create(5000)
-            kp1, des1 = orb.detectAndCompute(gray1, None)
-            kp2, des2 = orb.detectAndCompute(gray2, None)
+            pts1, des1 = self._detect_features(doc1)
+            pts2, des2 = self._detect_features(doc2)
             
             if des1 is None or des2 is None:
                 return doc2
@@ -333,9 +455,9 @@ class DocumentComparator:
             # Sort matches by distance
             matches = sorted(matches, key=lambda x: x.distance)
             
-            # Extract matched keypoints
-            src_pts = np.float32([kp2[m.trainIdx].pt for m in matches[:100]]).reshape(-1, 1, 2)
-            dst_pts = np.float32([kp1[m.queryIdx].pt for m in matches[:100]]).reshape(-1, 1, 2)
+            # Extract matched keypoints (already in full-resolution coordinates)
+            src_pts = pts2[[m.trainIdx for m in matches[:100]]].reshape(-1, 1, 2)
+            dst_pts = pts1[[m.queryIdx for m in matches[:100]]].reshape(-1, 1, 2)
             
             # Find homography
             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
@@ -353,30 +475,119 @@ class DocumentComparator:
             # If alignment fails, return original
             return doc2
     
-    def _classify_difference(self, region1: np.ndarray, region2: np.ndarray) -> DifferenceType:
+    def _absdiff(self, gray1: np.ndarray, gray2: np.ndarray) -> np.ndarray:
+        """Absolute difference written into the reusable scratch buffer"""
+        if self._diff_buf is None or self._diff_buf.shape != gray1.shape:
+            self._diff_buf = np.empty_like(gray1)
+        
+        return cv2.absdiff(gray1, gray2, dst=self._diff_buf)
+    
+    def _prepare_pair(self, doc1: np.ndarray, doc2: np.ndarray) -> np.ndarray:
+        """Align doc2 to doc1 and resize it to doc1's dimensions if needed"""
+        doc2_aligned = self._align_documents(doc1, doc2)
+        
+        if doc1.shape != doc2_aligned.shape:
+            doc2_aligned = cv2.resize(doc2_aligned, (doc1.shape[1], doc1.shape[0]))
+        
+        return doc2_aligned
+    
+    def _detect_features(self, doc: np.ndarray) -> Tuple:
         """
-        Classify type of difference in region
+        Detect ORB keypoints and descriptors, reusing cached results
+        
+        Detection runs on a copy downscaled to align_max_dimension; the
+        keypoint coordinates are scaled back, so a homography estimated
+        from them applies directly to the full-resolution image.
+        
+        The cache entry keeps a reference to the document, so its buffer
+        address cannot be reused by another image while it is cached.
         
         Args:
-            region1: Region from first document
-            region2: Region from second document
+            doc: Document image
             
         Returns:
-            Type of difference
+            Tuple of (keypoint coordinates as float32 Nx2 array, descriptors)
         """
-        mean1 = np.mean(region1)
-        mean2 = np.mean(region2)
+        key = (doc.ctypes.data, doc.shape, doc.strides, doc.dtype.str)
+        cached = self._feature_cache.get(key)
+        if cached is not None:
+            return cached[1], cached[2]
+        
+        gray = self._to_gray(doc)
+        scale = min(1.0, self.align_max_dimension / max(gray.shape[:2]))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        kp, des = self._orb.detectAndCompute(gray, None)
+        pts = np.array([k.pt for k in kp], dtype=np.float32).reshape(-1, 2)
+        if scale < 1.0:
+            pts /= scale
+        
+        # Evict the oldest entry
+        if len(self._feature_cache) >= self._feature_cache_size:
+            self._feature_cache.pop(next(iter(self._feature_cache)))
+        self._feature_cache[key] = (doc, pts, des)
+        
+        return pts, des
+    
+    def clear_feature_cache(self):
+        """Forget cached keypoints (needed if a document was modified in place)"""
+        self._feature_cache.clear()
+    
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """Convert a BGR or BGRA image to grayscale (grayscale passes through)"""
+        if image.ndim == 2:
+            return image
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    @staticmethod
+    def _box_means(integrals: List[np.ndarray], boxes: np.ndarray) -> List[np.ndarray]:
+        """
+        Mean pixel value inside each box, read from integral images
         
+        Args:
+            integrals: Integral images from cv2.integral, all the same size
+            boxes: (N, 4) array of x, y, width, height
+            
+        Returns:
+            One array of N region means per integral image
+        """
+        x, y, w, h = boxes.T
+        x2 = x + w
+        y2 = y + h
+        area = w * h
+        
+        return [
+            (integral[y2, x2] - integral[y, x2] - integral[y2, x] + integral[y, x]) / area
+            for integral in integrals
+        ]
+    
+    def _classify_differences(self, means1: np.ndarray, means2: np.ndarray) -> List[DifferenceType]:
+        """
+        Classify type of difference for each region
+        
+        Args:
+            means1: Region means in the first document
+            means2: Region means in the second document
+            
+        Returns:
+            Type of difference per region
+        """
         # Simple classification based on brightness
-        if mean1 > 200 and mean2 < 100:
-            return DifferenceType.ADDED
-        elif mean1 < 100 and mean2 > 200:
-            return DifferenceType.REMOVED
-        else:
-            return DifferenceType.MODIFIED
+        added = (means1 > 200) & (means2 < 100)
+        removed = (means1 < 100) & (means2 > 200)
+        
+        return [
+            DifferenceType.ADDED if a else DifferenceType.REMOVED if r else DifferenceType.MODIFIED
+            for a, r in zip(added.tolist(), removed.tolist())
+        ]
     
     def generate_comparison_report(self, doc1: np.ndarray, doc2: np.ndarray,
-                                   differences: List[Difference]) -> str:
+                                   differences: List[Difference],
+                                   similarity: Optional[float] = None) -> str:
         """
         Generate text report of comparison
         
@@ -384,12 +595,14 @@ class DocumentComparator:
             doc1: First document
             doc2: Second document
             differences: List of differences
+            similarity: Precomputed similarity (e.g. from compare_pair)
             
         Returns:
             Formatted report string
         """
         summary = self.get_difference_summary(differences)
-        similarity = self.calculate_similarity(doc1, doc2)
+        if similarity is None:
+            similarity = self.calculate_similarity(doc1, doc2)
         
         report = f"""
 Document Comparison Report
@@ -1,34 +1,162 @@
 """History manager for undo/redo functionality"""
 
+import zlib
+from collections import deque
+from types import MappingProxyType
 import numpy as np
-from typing import List, Optional, Dict, Any
+from typing import Deque, List, Optional, Dict, Any, Mapping
 import copy
 
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+def _compress(data) -> bytes:
+    """Compress a buffer with LZ4 if available, else fast zlib"""
+    if LZ4_AVAILABLE:
+        return lz4.frame.compress(data)
+    return zlib.compress(data, 1)
+
+
+def _decompress(blob: bytes) -> bytes:
+    """Inverse of _compress"""
+    if LZ4_AVAILABLE:
+        return lz4.frame.decompress(blob)
+    return zlib.decompress(blob)
+
+
+_EMPTY_SETTINGS: Mapping = MappingProxyType({})
+
+# Interned read-only settings, shared by every state with equal settings
+_settings_cache: Dict[frozenset, Mapping] = {}
+_SETTINGS_CACHE_LIMIT = 256
+
+
+def _intern_settings(settings: Optional[Dict]) -> Mapping:
+    """Return a shared read-only view of settings"""
+    if not settings:
+        return _EMPTY_SETTINGS
+    try:
+        # The value type is part of the key so that 1 and True stay distinct
+        key = frozenset((k, type(v), v) for k, v in settings.items())
+    except TypeError:
+        # Unhashable values (nested dicts, lists) cannot be interned
+        return MappingProxyType(dict(settings))
+    
+    view = _settings_cache.get(key)
+    if view is None:
+        if len(_settings_cache) >= _SETTINGS_CACHE_LIMIT:
+            _settings_cache.clear()
+        view = _settings_cache[key] = MappingProxyType(dict(settings))
+    return view
+
 
 class HistoryState:
     """Represents a single state in the history"""
     
-    def __init__(self, image: np.ndarray, description: str = "", settings: Optional[Dict] = None):
+    __slots__ = ('_blob', '_shape', '_dtype', '_base', 'depth', 'description', 'settings')
+    
+    def __init__(self, image: np.ndarray, description: str = "", settings: Optional[Dict] = None,
+                 base: Optional['HistoryState'] = None, base_image: Optional[np.ndarray] = None):
         """
         Initialize history state.
         
+        The image is kept compressed and only expanded by get_image. With a
+        base state (same shape and dtype), only the XOR difference to the
+        base image is stored; unchanged pixels become zeros that compress
+        to almost nothing.
+        
         Args:
             image: Image data
             description: Description of this state
-            settings: Dictionary of settings at this state
+            settings: Dictionary of settings at this state; stored as a
+                read-only mapping shared with other states of equal settings
+            base: State to store the image as a difference against
+            base_image: Image of the base state, if already at hand
         """
-        self.image = image.copy() if image is not None else None
+        self._base = None
+        self.depth = 0  # Number of deltas to apply on top of a full image
+        
+        if image is not None:
+            image = np.ascontiguousarray(image)
+            self._shape = image.shape
+            self._dtype = image.dtype
+            
+            if base is not None and base.matches(image):
+                if base_image is None:
+                    base_image = base.get_image()
+                image = np.bitwise_xor(base_image, image)
+                self._base = base
+                self.depth = base.depth + 1
+            
+            self._blob = _compress(memoryview(image).cast('B'))
+        else:
+            self._blob = None
         self.description = description
-        self.settings = settings.copy() if settings else {}
+        self.settings = _intern_settings(settings)
+    
+    def matches(self, image: Optional[np.ndarray]) -> bool:
+        """Check whether image could be stored as a difference to this state"""
+        return (
+            self._blob is not None and image is not None
+            and image.shape == self._shape and image.dtype == self._dtype
+        )
+    
+    @property
+    def image(self) -> Optional[np.ndarray]:
+        """Decompressed image (read-only, see get_image)"""
+        return self.get_image()
+    
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored (compressed) image data"""
+        return len(self._blob) if self._blob is not None else 0
         
     def get_image(self) -> Optional[np.ndarray]:
-        """Get image copy"""
-        return self.image.copy() if self.image is not None else None
+        """
+        Get the image of this state.
+        
+        The array is read-only and shared with no one else; callers that
+        want to edit it in place must take a .copy() first.
+        
+        Returns:
+            Read-only image, or None
+        """
+        if self._blob is None:
+            return None
+        if self._base is None:
+            # frombuffer over the decompressed bytes: no extra copy
+            return self._decode()
+        
+        image = self._materialize()
+        image.flags.writeable = False
+        return image
+    
+    def _decode(self) -> np.ndarray:
+        """Decompress the stored data into a read-only array"""
+        return np.frombuffer(_decompress(self._blob), dtype=self._dtype).reshape(self._shape)
+    
+    def _materialize(self) -> np.ndarray:
+        """Rebuild the image into a fresh writable array"""
+        if self._base is None:
+            return self._decode().copy()
+        
+        # XOR each difference into the base image's fresh array
+        image = self._base._materialize()
+        np.bitwise_xor(image, self._decode(), out=image)
+        return image
 
 
 class HistoryManager:
     """Manages undo/redo history for image editing"""
     
+    # A full image is stored at least every this many states, which bounds
+    # how many differences get_image has to apply
+    KEYFRAME_INTERVAL = 8
+    
     def __init__(self, max_history: int = 50):
         """
         Initialize history manager.
@@ -37,9 +165,15 @@ class HistoryManager:
             max_history: Maximum number of history states to keep
         """
         self.max_history = max_history
-        self.history: List[HistoryState] = []
+        # Appending past maxlen drops the oldest state in O(1)
+        self.history: Deque[HistoryState] = deque(maxlen=max_history)
         self.current_index = -1
         
+        # Most recently added state and a copy of its image, so the next
+        # state's difference does not need to decompress it again
+        self._last_state: Optional[HistoryState] = None
+        self._last_image: Optional[np.ndarray] = None
+        
     def add_state(self, image: np.ndarray, description: str = "", settings: Optional[Dict] = None):
         """
         Add a new state to history.
@@ -50,20 +184,22 @@ class HistoryManager:
             settings: Current settings
         """
         # Remove any states after current index (if we undid and then did a new action)
-        if self.current_index < len(self.history) - 1:
-            self.history = self.history[:self.current_index + 1]
+        for _ in range(len(self.history) - 1 - self.current_index):
+            self.history.pop()
         
-        # Add new state
-        state = HistoryState(image, description, settings)
+        # Add new state, as a difference to the previous one between keyframes
+        base = self.history[-1] if self.history else None
+        if base is not None and (base.depth + 1 >= self.KEYFRAME_INTERVAL or not base.matches(image)):
+            base = None
+        base_image = self._last_image if base is not None and base is self._last_state else None
+        
+        state = HistoryState(image, description, settings, base=base, base_image=base_image)
         self.history.append(state)
         
-        # Limit history size
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-        else:
-            self.current_index += 1
+        self._last_state = state
+        self._last_image = image.copy() if image is not None else None
         
-        # Always keep current_index within bounds
+        # The new state is always the last one
         self.current_index = len(self.history) - 1
     
     def can_undo(self) -> bool:
@@ -121,8 +257,10 @@ class HistoryManager:
     
     def clear(self):
         """Clear all history"""
-        self.history = []
+        self.history.clear()
         self.current_index = -1
+        self._last_state = None
+        self._last_image = None
     
     def get_memory_usage(self) -> str:
         """
@@ -131,10 +269,7 @@ class HistoryManager:
         Returns:
             Human-readable memory usage string
         """
-        total_bytes = 0
-        for state in self.history:
-            if state.image is not None:
-                total_bytes += state.image.nbytes
+        total_bytes = sum(state.nbytes for state in self.history)
         
         # Convert to MB
         mb = total_bytes / (1024 * 1024)
@@ -9,7 +9,21 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 from PIL import Image
 import io
+import math
+from collections import deque
+from itertools import islice
 import cv2
+from concurrent.futures import ThreadPoolExecutor
+from .image_processor import ImageProcessor
+
+
+def _readonly_view(image: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Read-only view of image (no pixel copy)"""
+    if image is None:
+        return None
+    view = image.view()
+    view.flags.writeable = False
+    return view
 
 
 class Page:
@@ -19,35 +33,71 @@ class Page:
         """
         Initialize a page.
         
+        The image is stored by reference as a read-only view; callers must
+        not modify the array they pass in afterwards.
+        
         Args:
             image: Page image
             name: Page name/description
             page_number: Page number
         """
-        self.image = image.copy() if image is not None else None
+        self.image = image
         self.name = name or f"Page {page_number}"
         self.page_number = page_number
         self.timestamp = datetime.now()
+        self._timestamp_str = self.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Last thumbnail as (size, source image, thumbnail); reassigning
+        # self.image makes it stale
+        self._thumbnail_cache = None
+    
+    @property
+    def image(self) -> Optional[np.ndarray]:
+        """Page image (read-only view)"""
+        return self._image
+    
+    @image.setter
+    def image(self, image: Optional[np.ndarray]):
+        self._image = _readonly_view(image)
+        self._shape = image.shape if image is not None else None
         
     def get_image(self) -> Optional[np.ndarray]:
-        """Get image copy"""
-        return self.image.copy() if self.image is not None else None
+        """Get the page image (read-only; use clone() to get an editable copy)"""
+        return self.image
+    
+    def clone(self) -> 'Page':
+        """Get a copy of this page that owns its own copy of the image"""
+        page = Page(self.image.copy() if self.image is not None else None,
+                    self.name, self.page_number)
+        page.timestamp = self.timestamp
+        page._timestamp_str = self._timestamp_str
+        return page
     
     def get_thumbnail(self, size: tuple = (150, 200)) -> Optional[np.ndarray]:
         """
         Get thumbnail version of page.
         
+        Images that already fit in size are returned as is (not upscaled).
+        
         Args:
             size: Thumbnail size (width, height)
             
         Returns:
-            Thumbnail image
+            Thumbnail image (read-only)
         """
         if self.image is None:
             return None
         
-        # Calculate aspect ratio
+        cached = self._thumbnail_cache
+        if cached is not None and cached[0] == size and cached[1] is self.image:
+            return cached[2]
+        
+        # Already small enough: no resize at all
         h, w = self.image.shape[:2]
+        if w <= size[0] and h <= size[1]:
+            return self.image
+        
+        # Calculate aspect ratio
         aspect = w / h
         
         if aspect > size[0] / size[1]:
@@ -60,6 +110,8 @@ class Page:
             new_w = int(new_h * aspect)
         
         thumbnail = cv2.resize(self.image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        thumbnail.flags.writeable = False
+        self._thumbnail_cache = (size, self.image, thumbnail)
         return thumbnail
 
 
@@ -100,8 +152,9 @@ class MultiPageManager:
         """
         if 0 <= index < len(self.pages):
             self.pages.pop(index)
-            # Update page numbers
-            for i, page in enumerate(self.pages):
+            # Update page numbers; only pages after the removed one moved
+            for i in range(index, len(self.pages)):
+                page = self.pages[i]
                 page.page_number = i + 1
                 if not page.name.startswith("Page "):
                     # Keep custom names
@@ -128,12 +181,19 @@ class MultiPageManager:
             True if successful
         """
         if 0 <= from_index < len(self.pages) and 0 <= to_index < len(self.pages):
-            page = self.pages.pop(from_index)
-            self.pages.insert(to_index, page)
+            if abs(from_index - to_index) == 1:
+                # Neighbours (drag by one slot): swap without shifting the list
+                self.pages[from_index], self.pages[to_index] = (
+                    self.pages[to_index], self.pages[from_index]
+                )
+            elif from_index != to_index:
+                # pop/insert shift the list tail with a single memmove each
+                page = self.pages.pop(from_index)
+                self.pages.insert(to_index, page)
             
-            # Update page numbers
-            for i, p in enumerate(self.pages):
-                p.page_number = i + 1
+            # Update page numbers of the pages between the two positions
+            for i in range(min(from_index, to_index), max(from_index, to_index) + 1):
+                self.pages[i].page_number = i + 1
             
             self.current_page_index = to_index
             return True
@@ -163,29 +223,72 @@ class MultiPageManager:
         self.pages = []
         self.current_page_index = -1
     
-    def update_page_image(self, index: int, image: np.ndarray) -> bool:
+    def update_page_image(self, index: int, image: np.ndarray, copy: bool = False) -> bool:
         """
         Update image for a specific page.
         
         Args:
             index: Page index
             image: New image
+            copy: Store a copy instead of taking over the caller's array
+                  (which must then not be modified)
             
         Returns:
             True if successful
         """
         if 0 <= index < len(self.pages):
-            self.pages[index].image = image.copy()
+            self.pages[index].image = image.copy() if copy else image
             return True
         return False
     
-    def export_to_pdf(self, output_path: str, page_size: str = 'A4') -> bool:
+    @staticmethod
+    def _pdf_image(image: np.ndarray, jpeg_quality: int) -> ImageReader:
+        """
+        Wrap a page image for drawing into the PDF.
+        
+        Color pages are encoded to JPEG straight from BGR; reportlab embeds
+        JPEG data as is, so there is no RGB conversion or re-encode.
+        Grayscale pages (often black and white) stay lossless.
+        """
+        if len(image.shape) == 3:
+            ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            if ok:
+                return ImageReader(io.BytesIO(buf.tobytes()))
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return ImageReader(Image.fromarray(image))
+    
+    def enhance_all(self, mode: str = 'document') -> int:
+        """
+        Auto-enhance every page in place.
+        
+        Pages run one after another on this thread, so auto_enhance reuses
+        the same intermediate buffers for all of them.
+        
+        Args:
+            mode: Enhancement mode ('document', 'photo')
+            
+        Returns:
+            Number of pages enhanced
+        """
+        count = 0
+        for page in self.pages:
+            if page.image is not None:
+                page.image = ImageProcessor.auto_enhance(page.image, mode)
+                count += 1
+        return count
+    
+    def export_to_pdf(self, output_path: str, page_size: str = 'A4',
+                      jpeg_quality: int = 85, target_dpi: Optional[int] = 300) -> bool:
         """
         Export all pages to a multi-page PDF.
         
         Args:
             output_path: Output PDF file path
             page_size: Page size ('A4' or 'Letter')
+            jpeg_quality: JPEG quality (0-100) for color pages
+            target_dpi: Pages with more pixels than this resolution at
+                        their printed size are downscaled before embedding
+                        (None embeds full resolution)
             
         Returns:
             True if successful
@@ -204,21 +307,10 @@ class MultiPageManager:
             c = canvas.Canvas(output_path, pagesize=ps)
             page_width, page_height = ps
             
-            for page in self.pages:
-                if page.image is None:
-                    continue
-                
-                # Convert OpenCV image to PIL Image
-                if len(page.image.shape) == 3:
-                    # BGR to RGB
-                    rgb_image = cv2.cvtColor(page.image, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(rgb_image)
-                else:
-                    # Grayscale
-                    pil_image = Image.fromarray(page.image)
-                
+            def prepare(page: Page):
+                """Lay out, downscale and encode one page (runs on a worker)"""
                 # Calculate image dimensions to fit page
-                img_width, img_height = pil_image.size
+                img_height, img_width = page.image.shape[:2]
                 aspect = img_width / img_height
                 
                 # Add margins
@@ -240,17 +332,44 @@ class MultiPageManager:
                 x = (page_width - draw_width) / 2
                 y = (page_height - draw_height) / 2
                 
-                # Draw image
-                c.drawImage(ImageReader(pil_image), x, y, 
-                           width=draw_width, height=draw_height)
+                # Pixels beyond target_dpi at the drawn size are never seen
+                image = page.image
+                if target_dpi:
+                    target_w = math.ceil(draw_width * target_dpi / 72)
+                    target_h = math.ceil(draw_height * target_dpi / 72)
+                    if img_width > target_w * 1.1:
+                        image = cv2.resize(image, (target_w, target_h),
+                                           interpolation=cv2.INTER_AREA)
                 
-                # Add page number at bottom
-                c.setFont("Helvetica", 10)
-                c.drawCentredString(page_width / 2, 20, 
-                                   f"Page {page.page_number} of {len(self.pages)}")
-                
-                # Create new page for next image
-                c.showPage()
+                reader = self._pdf_image(image, jpeg_quality)
+                return reader, x, y, draw_width, draw_height
+            
+            pages = iter([page for page in self.pages if page.image is not None])
+            
+            # Encoding (which releases the GIL) runs up to two pages ahead
+            # of drawing, so both overlap
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                pending = deque(
+                    (page, executor.submit(prepare, page)) for page in islice(pages, 2)
+                )
+                while pending:
+                    page, future = pending.popleft()
+                    reader, x, y, draw_width, draw_height = future.result()
+                    
+                    next_page = next(pages, None)
+                    if next_page is not None:
+                        pending.append((next_page, executor.submit(prepare, next_page)))
+                    
+                    # Draw image
+                    c.drawImage(reader, x, y, width=draw_width, height=draw_height)
+                    
+                    # Add page number at bottom
+                    c.setFont("Helvetica", 10)
+                    c.drawCentredString(page_width / 2, 20, 
+                                       f"Page {page.page_number} of {len(self.pages)}")
+                    
+                    # Create new page for next image
+                    c.showPage()
             
             # Save PDF
             c.save()
@@ -264,6 +383,9 @@ class MultiPageManager:
         """
         Export all pages as individual images.
         
+        Pages are encoded and written on a thread pool; cv2.imwrite releases
+        the GIL, so pages are processed in parallel.
+        
         Args:
             output_folder: Output folder path
             format: Image format ('png', 'jpg', 'tiff')
@@ -279,21 +401,35 @@ class MultiPageManager:
             'files': []
         }
         
-        for i, page in enumerate(self.pages):
-            if page.image is None:
-                results['failed'] += 1
-                continue
+        def save(i: int, image: Optional[np.ndarray]) -> Optional[str]:
+            if image is None:
+                return None
             
             filename = f"page_{i+1:03d}.{format}"
             filepath = os.path.join(output_folder, filename)
             
             try:
-                cv2.imwrite(filepath, page.image)
-                results['success'] += 1
-                results['files'].append(filepath)
+                if cv2.imwrite(filepath, image):
+                    return filepath
+                print(f"Error saving page {i+1}: could not write {filepath}")
             except Exception as e:
                 print(f"Error saving page {i+1}: {e}")
-                results['failed'] += 1
+            return None
+        
+        if not self.pages:
+            return results
+        
+        workers = min(len(self.pages), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map keeps the page order for results['files']
+            saved = executor.map(save, range(len(self.pages)),
+                                 [page.image for page in self.pages])
+            for filepath in saved:
+                if filepath is None:
+                    results['failed'] += 1
+                else:
+                    results['success'] += 1
+                    results['files'].append(filepath)
         
         return results
     
@@ -304,14 +440,14 @@ class MultiPageManager:
         Returns:
             List of page info dictionaries
         """
-        info = []
-        for i, page in enumerate(self.pages):
-            info.append({
+        return [
+            {
                 'index': i,
                 'number': page.page_number,
                 'name': page.name,
-                'timestamp': page.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'has_image': page.image is not None,
-                'size': page.image.shape if page.image is not None else None
-            })
-        return info
+                'timestamp': page._timestamp_str,
+                'has_image': page._shape is not None,
+                'size': page._shape
+            }
+            for i, page in enumerate(self.pages)
+        ]
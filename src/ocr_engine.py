@@ -3,18 +3,68 @@ OCR (Optical Character Recognition) Engine
 Extract text from scanned documents using Tesseract OCR
 """
 
+import os
+import tempfile
+import threading
 import cv2
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional
 import re
 from dataclasses import dataclass
 
+from .utils import get_clahe, opencl_available, scratch_buffer, to_host
+
 try:
     import pytesseract
     TESSERACT_AVAILABLE = True
 except ImportError:
     TESSERACT_AVAILABLE = False
 
+# In-process Tesseract API: no subprocess or model reload per call
+try:
+    from PIL import Image
+    from tesserocr import PyTessBaseAPI, RIL, iterate_level
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+
+# Metadata patterns, compiled once. Dates keep three separate patterns:
+# each is searched over the whole text, as before, so overlapping forms
+# (e.g. '23-01-15' inside '2023-01-15') are all still reported
+_DATE_PATTERNS = (
+    re.compile(r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}', re.IGNORECASE),  # MM/DD/YYYY
+    re.compile(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}', re.IGNORECASE),     # YYYY-MM-DD
+    re.compile(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',
+               re.IGNORECASE),
+)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_AMOUNT_RE = re.compile(r'\$\s*\d+(?:,\d{3})*(?:\.\d{2})?|\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:USD|EUR|GBP)')
+
+# First non-blank line: from its first non-space character to the newline
+_FIRST_LINE_RE = re.compile(r'\S[^\n]*')
+
+
+# Per-process OCREngine, built once by _init_ocr_worker
+_worker = threading.local()
+
+
+def _init_ocr_worker():
+    """Set up a pool worker: one single-threaded Tesseract per process"""
+    # Inherited by the tesseract processes this worker spawns; N single-
+    # threaded processes beat N processes each running OpenMP threads
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+    _worker.engine = OCREngine()
+
+
+def _extract_one(args: Tuple) -> 'OCRResult':
+    """Run extract_text for one image on the current pool worker"""
+    return _worker.engine.extract_text(*args)
+
 
 @dataclass
 class OCRResult:
@@ -39,13 +89,44 @@ class OCREngine:
     def __init__(self):
         """Initialize OCR engine"""
         self.available = TESSERACT_AVAILABLE
+        # tesserocr APIs by language, created on first use. An API is not
+        # thread-safe, so share an engine only within one thread
+        self._apis = {}
+        # Run preprocessing through cv2.UMat (OpenCL) when a device exists
+        self.use_gpu = False
+    
+    def __del__(self):
+        """Release any tesserocr APIs"""
+        for api in getattr(self, '_apis', {}).values():
+            api.End()
+    
+    def _get_api(self, lang: str):
+        """Get the tesserocr API for a language, creating it on first use"""
+        api = self._apis.get(lang)
+        if api is None:
+            api = self._apis[lang] = PyTessBaseAPI(lang=lang)
+        return api
+    
+    def _tesserocr_words(self, api):
+        """Yield TSV-like word rows from the API's last recognition"""
+        block_num = 0
+        for word in iterate_level(api.GetIterator(), RIL.WORD):
+            if word.IsAtBeginningOf(RIL.BLOCK):
+                block_num += 1
+            text_item = word.GetUTF8Text(RIL.WORD)
+            box = word.BoundingBox(RIL.WORD)
+            if text_item is None or box is None:
+                continue
+            x1, y1, x2, y2 = box
+            yield (text_item, word.Confidence(RIL.WORD),
+                   x1, y1, x2 - x1, y2 - y1, block_num)
         
     def is_available(self) -> bool:
         """Check if OCR is available"""
         return self.available
     
     def extract_text(self, image: np.ndarray, lang: str = 'eng', 
-                     preprocess: bool = True) -> OCRResult:
+                     preprocess: bool = True, denoise: str = 'fast') -> OCRResult:
         """
         Extract text from image
         
@@ -53,6 +134,8 @@ class OCREngine:
             image: Input image (numpy array)
             lang: Language code (e.g., 'eng', 'fra', 'spa')
             preprocess: Apply preprocessing for better OCR
+            denoise: Denoising during preprocessing: 'none', 'fast'
+                     (3x3 median) or 'quality' (non-local means, slow)
             
         Returns:
             OCRResult object with text and metadata
@@ -62,47 +145,76 @@ class OCREngine:
         
         # Preprocess image if requested
         if preprocess:
-            processed = self._preprocess_for_ocr(image)
+            processed = self._preprocess_for_ocr(image, denoise)
         else:
             processed = image
         
-        # Extract detailed data
-        data = pytesseract.image_to_data(processed, lang=lang, output_type=pytesseract.Output.DICT)
+        word_boxes, lines, avg_confidence = self._extract_data(processed, lang)
+        if TESSEROCR_AVAILABLE:
+            # Same image, already recognized: the text comes for free
+            text = self._get_api(lang).GetUTF8Text()
+        else:
+            text = self._extract_string(processed, lang)
         
-        # Extract text
-        text = pytesseract.image_to_string(processed, lang=lang)
+        return OCRResult(
+            text=text,
+            confidence=avg_confidence,
+            word_boxes=word_boxes,
+            lines=lines
+        )
+    
+    def _extract_data(self, processed: np.ndarray,
+                      lang: str) -> Tuple[List[Dict], List[str], float]:
+        """
+        Recognize words in a preprocessed image
         
-        # Parse results
+        Args:
+            processed: Image ready for Tesseract
+            lang: Language code
+            
+        Returns:
+            Tuple of (word_boxes, lines, average confidence)
+        """
+        if TESSEROCR_AVAILABLE:
+            api = self._get_api(lang)
+            api.SetImage(Image.fromarray(processed))
+            api.Recognize()
+            rows = self._tesserocr_words(api)
+        else:
+            data = pytesseract.image_to_data(processed, lang=lang, output_type=pytesseract.Output.DICT)
+            rows = zip(data['text'], data['conf'], data['left'], data['top'],
+                       data['width'], data['height'], data['block_num'])
+        
+        # Parse results (one pass over the TSV columns; most rows are
+        # layout rows with conf -1, so test that before touching the text)
         word_boxes = []
         confidences = []
         lines = []
         current_line = []
         last_block = -1
         
-        n_boxes = len(data['text'])
-        for i in range(n_boxes):
-            confidence = int(data['conf'][i])
-            text_item = data['text'][i].strip()
+        for text_item, confidence, x, y, w, h, block_num in rows:
+            confidence = int(confidence)
+            if confidence <= 0:
+                continue
+            text_item = text_item.strip()
+            if not text_item:
+                continue
             
-            if confidence > 0 and text_item:
-                # Get bounding box
-                x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                
-                word_boxes.append({
-                    'text': text_item,
-                    'confidence': confidence,
-                    'box': (x, y, w, h)
-                })
-                confidences.append(confidence)
-                
-                # Build lines
-                block_num = data['block_num'][i]
-                if block_num != last_block and current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = []
-                    last_block = block_num
-                
-                current_line.append(text_item)
+            word_boxes.append({
+                'text': text_item,
+                'confidence': confidence,
+                'box': (x, y, w, h)
+            })
+            confidences.append(confidence)
+            
+            # Build lines
+            if block_num != last_block and current_line:
+                lines.append(' '.join(current_line))
+                current_line = []
+                last_block = block_num
+            
+            current_line.append(text_item)
         
         # Add last line
         if current_line:
@@ -111,12 +223,89 @@ class OCREngine:
         # Calculate average confidence
         avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
         
-        return OCRResult(
-            text=text,
-            confidence=avg_confidence,
-            word_boxes=word_boxes,
-            lines=lines
-        )
+        return word_boxes, lines, avg_confidence
+    
+    def _extract_string(self, processed: np.ndarray, lang: str) -> str:
+        """Recognize a preprocessed image as plain text"""
+        if TESSEROCR_AVAILABLE:
+            api = self._get_api(lang)
+            api.SetImage(Image.fromarray(processed))
+            return api.GetUTF8Text()
+        return pytesseract.image_to_string(processed, lang=lang)
+    
+    def extract_text_batch(self, images: List[np.ndarray], lang: str = 'eng',
+                           preprocess: bool = True,
+                           workers: Optional[int] = None) -> List[OCRResult]:
+        """
+        Extract text from several images (e.g. the pages of a document)
+        
+        Pages are independent, so they are spread over a pool of worker
+        processes, each running single-threaded Tesseract.
+        
+        Args:
+            images: Input images
+            lang: Language code
+            preprocess: Apply preprocessing for better OCR
+            workers: Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            One OCRResult per image, in input order
+        """
+        if not self.available:
+            raise RuntimeError("Tesseract OCR is not installed. Install with: pip install pytesseract")
+        
+        workers = min(len(images), workers or os.cpu_count() or 1)
+        if workers <= 1:
+            return [self.extract_text(image, lang, preprocess) for image in images]
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker) as executor:
+            return list(executor.map(_extract_one, [(image, lang, preprocess) for image in images]))
+    
+    # Images per tesseract call in extract_text_many
+    LIST_CHUNK_SIZE = 50
+    
+    def extract_text_many(self, images: List[np.ndarray], lang: str = 'eng',
+                          preprocess: bool = True) -> List[str]:
+        """
+        Extract plain text from several images with few Tesseract runs
+        
+        The images are written to a temporary folder and passed to
+        Tesseract as an image list file, so the process start and model
+        load happen once per LIST_CHUNK_SIZE images instead of per image.
+        
+        Args:
+            images: Input images
+            lang: Language code
+            preprocess: Apply preprocessing for better OCR
+            
+        Returns:
+            Extracted text per image, in input order
+        """
+        if not self.available:
+            raise RuntimeError("Tesseract OCR is not installed")
+        
+        texts = []
+        with tempfile.TemporaryDirectory(prefix='ocr_') as folder:
+            for start in range(0, len(images), self.LIST_CHUNK_SIZE):
+                chunk = images[start:start + self.LIST_CHUNK_SIZE]
+                
+                paths = []
+                for i, image in enumerate(chunk, start):
+                    path = os.path.join(folder, f"page_{i:05d}.png")
+                    cv2.imwrite(path, self._preprocess_for_ocr(image) if preprocess else image)
+                    paths.append(path)
+                
+                list_path = os.path.join(folder, f"list_{start:05d}.txt")
+                with open(list_path, 'w') as f:
+                    f.write('\n'.join(paths) + '\n')
+                
+                # Tesseract ends every page with a form feed
+                output = pytesseract.image_to_string(list_path, lang=lang)
+                pages = output.split('\f')
+                pages += [''] * (len(chunk) - len(pages))
+                texts.extend(pages[:len(chunk)])
+        
+        return texts
     
     def extract_text_simple(self, image: np.ndarray, lang: str = 'eng') -> str:
         """
@@ -133,7 +322,11 @@ class OCREngine:
             raise RuntimeError("Tesseract OCR is not installed")
         
         processed = self._preprocess_for_ocr(image)
-        return pytesseract.image_to_string(processed, lang=lang)
+        return self._extract_string(processed, lang)
+    
+    # Longest side detect_text_regions runs Tesseract at; its layout
+    # analysis gains nothing from larger input
+    REGION_MAX_DIMENSION = 1600
     
     def detect_text_regions(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
@@ -143,19 +336,30 @@ class OCREngine:
             image: Input image
             
         Returns:
-            List of bounding boxes (x, y, w, h)
+            List of bounding boxes (x, y, w, h) in input image coordinates
         """
         if not self.available:
             return []
         
+        # Detect on a copy no larger than REGION_MAX_DIMENSION
+        h, w = image.shape[:2]
+        scale = min(1.0, self.REGION_MAX_DIMENSION / max(h, w))
+        if scale < 1.0:
+            small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            small = image
+        
         # Use tesseract to detect text regions
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        data = pytesseract.image_to_data(small, output_type=pytesseract.Output.DICT)
         
         boxes = []
         n_boxes = len(data['text'])
         for i in range(n_boxes):
             if int(data['conf'][i]) > 30:  # Confidence threshold
                 x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+                if scale < 1.0:
+                    x, y = round(x / scale), round(y / scale)
+                    w, h = round(w / scale), round(h / scale)
                 boxes.append((x, y, w, h))
         
         return boxes
@@ -171,13 +375,13 @@ class OCREngine:
         Returns:
             Suggested filename
         """
-        # Get first meaningful line
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if not lines:
+        # Get first meaningful line, without splitting the rest of the text
+        match = _FIRST_LINE_RE.search(text)
+        if match is None:
             return "untitled"
         
         # Use first line or first few words
-        name = lines[0]
+        name = match.group().strip()
         
         # Clean filename
         name = re.sub(r'[^\w\s-]', '', name)  # Remove special chars
@@ -188,7 +392,8 @@ class OCREngine:
         return name if name else "untitled"
     
     def search_text(self, image: np.ndarray, search_term: str, 
-                    case_sensitive: bool = False) -> List[Dict]:
+                    case_sensitive: bool = False,
+                    max_matches: Optional[int] = None) -> List[Dict]:
         """
         Search for specific text in image
         
@@ -196,55 +401,85 @@ class OCREngine:
             image: Input image
             search_term: Text to search for
             case_sensitive: Whether search is case sensitive
+            max_matches: Stop after this many matches (None for all)
             
         Returns:
             List of matches with bounding boxes
         """
-        result = self.extract_text(image)
+        if not self.available:
+            raise RuntimeError("Tesseract OCR is not installed. Install with: pip install pytesseract")
+        
+        # Word boxes only; the plain-text pass isn't needed for a search
+        word_boxes, _, _ = self._extract_data(self._preprocess_for_ocr(image), 'eng')
         matches = []
         
         search_lower = search_term if case_sensitive else search_term.lower()
         
-        for box in result.word_boxes:
+        for box in word_boxes:
             text = box['text'] if case_sensitive else box['text'].lower()
             if search_lower in text:
+                if max_matches is not None and len(matches) >= max_matches:
+                    break
                 matches.append(box)
         
         return matches
     
-    def _preprocess_for_ocr(self, image: np.ndarray) -> np.ndarray:
+    def _preprocess_for_ocr(self, image: np.ndarray, denoise: str = 'fast') -> np.ndarray:
         """
         Preprocess image for better OCR results
         
         Args:
             image: Input image
+            denoise: 'none', 'fast' (3x3 median; CLAHE + Otsu absorb what
+                     is left) or 'quality' (non-local means, much slower)
             
         Returns:
             Preprocessed image
         """
-        # Convert to grayscale if needed
+        # Upload once; every step below accepts a UMat
+        use_gpu = self.use_gpu and opencl_available()
+        src = cv2.UMat(image) if use_gpu else image
+        
+        # On the host, full-size intermediates go to per-thread scratch
+        # buffers instead of fresh page-sized allocations (dst=None lets
+        # OpenCV allocate as usual; only the returned binary is new)
+        height, width = image.shape[:2]
+        upscale = height < 300 or width < 300
+        reuse = not use_gpu and not upscale
+        
+        # Convert to grayscale if needed (nothing below writes to it)
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = cv2.cvtColor(
+                src, cv2.COLOR_BGR2GRAY,
+                dst=scratch_buffer('ocr_gray', (height, width)) if reuse else None
+            )
         else:
-            gray = image.copy()
+            gray = src
         
         # Resize if too small
-        height, width = gray.shape
-        if height < 300 or width < 300:
+        if upscale:
             scale = max(300 / height, 300 / width)
             gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
         
         # Denoise
-        denoised = cv2.fastNlMeansDenoising(gray)
+        denoised_buf = scratch_buffer('ocr_denoised', (height, width)) if reuse else None
+        if denoise == 'quality':
+            denoised = cv2.fastNlMeansDenoising(gray, dst=denoised_buf)
+        elif denoise == 'none':
+            denoised = gray
+        else:
+            denoised = cv2.medianBlur(gray, 3, dst=denoised_buf)
         
         # Increase contrast
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        contrast = clahe.apply(denoised)
+        contrast = get_clahe(2.0).apply(
+            denoised,
+            dst=scratch_buffer('ocr_contrast', (height, width)) if reuse else None
+        )
         
         # Threshold
         _, binary = cv2.threshold(contrast, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
-        return binary
+        return to_host(binary)
     
     def extract_metadata(self, image: np.ndarray) -> Dict:
         """
@@ -271,32 +506,23 @@ class OCREngine:
     
     def _extract_dates(self, text: str) -> List[str]:
         """Extract date patterns"""
-        patterns = [
-            r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',  # MM/DD/YYYY
-            r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',     # YYYY-MM-DD
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b'
-        ]
         dates = []
-        for pattern in patterns:
-            dates.extend(re.findall(pattern, text, re.IGNORECASE))
+        for pattern in _DATE_PATTERNS:
+            dates.extend(pattern.findall(text))
         return dates
     
     def _extract_emails(self, text: str) -> List[str]:
         """Extract email addresses"""
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.findall(pattern, text)
+        return _EMAIL_RE.findall(text)
     
     def _extract_phone_numbers(self, text: str) -> List[str]:
         """Extract phone numbers"""
-        pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
-        return re.findall(pattern, text)
+        return _PHONE_RE.findall(text)
     
     def _extract_urls(self, text: str) -> List[str]:
         """Extract URLs"""
-        pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        return re.findall(pattern, text)
+        return _URL_RE.findall(text)
     
     def _extract_amounts(self, text: str) -> List[str]:
         """Extract monetary amounts"""
-        pattern = r'\$\s*\d+(?:,\d{3})*(?:\.\d{2})?|\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:USD|EUR|GBP)'
-        return re.findall(pattern, text)
+        return _AMOUNT_RE.findall(text)
@@ -15,6 +15,8 @@ class DocumentScanner:
         self.original_image = None
         self.processed_image = None
         self.detected_corners = None
+        # Run preprocessing through cv2.UMat (OpenCL) when a device exists
+        self.use_gpu = False
         
     def load_image(self, filepath: str) -> bool:
         """
@@ -38,18 +40,26 @@ class DocumentScanner:
         """
         self.original_image = image.copy()
     
-    def preprocess_image(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    def preprocess_image(
+        self,
+        image: np.ndarray,
+        max_dimension: int = 1500
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Preprocess image for edge detection.
         
         Args:
             image: Input image
+            max_dimension: Longest side to work at
             
         Returns:
             Tuple of (resized, grayscale, edges)
         """
+        if self.use_gpu and utils.opencl_available():
+            return self._preprocess_image_ocl(image, max_dimension)
+        
         # Resize image for faster processing
-        resized = utils.resize_image(image, 1500, 1500)
+        resized = utils.resize_image(image, max_dimension, max_dimension)
         
         # Convert to grayscale
         gray = utils.convert_to_grayscale(resized)
@@ -66,22 +76,64 @@ class DocumentScanner:
         
         return resized, gray, edges
     
-    def detect_document(self, image: np.ndarray) -> Optional[np.ndarray]:
+    @staticmethod
+    def _preprocess_image_ocl(
+        image: np.ndarray,
+        max_dimension: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """preprocess_image with one upload and every step on the OpenCL device"""
+        src = cv2.UMat(image)
+        
+        # UMat has no shape, so size the resize from the host array
+        height, width = image.shape[:2]
+        if width > max_dimension or height > max_dimension:
+            scale = min(max_dimension / width, max_dimension / height)
+            src = cv2.resize(
+                src, (int(width * scale), int(height * scale)),
+                interpolation=utils.resize_interpolation(scale)
+            )
+        
+        gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else src
+        blurred = cv2.GaussianBlur(gray, constants.DEFAULT_BLUR_KERNEL, 0)
+        edges = cv2.Canny(
+            blurred,
+            constants.DEFAULT_CANNY_THRESHOLD1,
+            constants.DEFAULT_CANNY_THRESHOLD2
+        )
+        
+        return utils.to_host(src), utils.to_host(gray), utils.to_host(edges)
+    
+    def detect_document(self, image: np.ndarray, method: str = 'contour') -> Optional[np.ndarray]:
         """
         Detect document in the image.
         
         Args:
             image: Input image
+            method: 'contour' (largest quadrilateral contour) or 'hough'
+                (intersects the four outermost straight edges at a lower
+                working size; cheaper per camera frame, falls back to
+                'contour' when it cannot find four sides)
             
         Returns:
             Array of 4 corner points or None if not found
         """
+        if method == 'hough':
+            resized, gray, edges = self.preprocess_image(
+                image, constants.HOUGH_MAX_DIMENSION
+            )
+            corners = self._hough_corners(edges)
+            if corners is not None:
+                corners[:, 0] *= image.shape[1] / resized.shape[1]
+                corners[:, 1] *= image.shape[0] / resized.shape[0]
+                self.detected_corners = corners
+                return corners
+        
         # Preprocess image
         resized, gray, edges = self.preprocess_image(image)
         
-        # Find contours
+        # Find contours (findContours no longer modifies its input)
         contours, _ = cv2.findContours(
-            edges.copy(),
+            edges,
             cv2.RETR_LIST,
             cv2.CHAIN_APPROX_SIMPLE
         )
@@ -99,8 +151,8 @@ class DocumentScanner:
                 True
             )
             
-            # If we found a quadrilateral with sufficient area
-            if len(approx) == 4:
+            # If we found a convex quadrilateral with sufficient area
+            if utils.validate_quadrilateral(approx):
                 area = cv2.contourArea(approx)
                 if area > constants.MIN_DOCUMENT_AREA:
                     # Scale points back to original image size
@@ -117,6 +169,85 @@ class DocumentScanner:
         # No document found
         return None
     
+    @staticmethod
+    def _hough_corners(edges: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Find document corners from the straight lines in an edge map.
+        
+        Segments are split into two orientation groups; the outermost
+        segment on each side of each group gives the four document edges,
+        and their pairwise intersections the corners.
+        
+        Args:
+            edges: Binary edge map
+            
+        Returns:
+            Array of 4 corner points in edge map coordinates or None
+        """
+        h, w = edges.shape[:2]
+        lines = cv2.HoughLinesP(
+            edges, 1, np.pi / 180, threshold=80,
+            minLineLength=min(h, w) // 4, maxLineGap=20
+        )
+        if lines is None or len(lines) < 4:
+            return None
+        
+        segments = lines.reshape(-1, 4).astype(np.float32)
+        p1 = segments[:, :2]
+        p2 = segments[:, 2:]
+        d = p2 - p1
+        angles = np.arctan2(d[:, 1], d[:, 0])
+        
+        # Cluster on the doubled angle so that directions differing by
+        # 180 degrees land together
+        features = np.column_stack([np.cos(2 * angles), np.sin(2 * angles)])
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1e-3)
+        _, labels, _ = cv2.kmeans(
+            features, 2, None, criteria, 3, cv2.KMEANS_PP_CENTERS
+        )
+        labels = labels.ravel()
+        
+        sides = []
+        for group in (0, 1):
+            members = np.flatnonzero(labels == group)
+            if len(members) < 2:
+                return None
+            # Offset of each segment midpoint along the group's mean normal
+            mean = np.arctan2(
+                features[members, 1].mean(), features[members, 0].mean()
+            ) / 2
+            normal = np.array([-np.sin(mean), np.cos(mean)], dtype=np.float32)
+            offsets = ((p1[members] + p2[members]) / 2) @ normal
+            near = members[np.argmin(offsets)]
+            far = members[np.argmax(offsets)]
+            if offsets.max() - offsets.min() < min(h, w) / 4:
+                return None
+            sides.append((near, far))
+        
+        # Homogeneous line through each chosen segment's endpoints
+        ones = np.ones((len(segments), 1), dtype=np.float64)
+        homog = np.cross(np.hstack([p1, ones]), np.hstack([p2, ones]))
+        
+        points = []
+        for a in sides[0]:
+            for b in sides[1]:
+                x, y, z = np.cross(homog[a], homog[b])
+                if abs(z) < 1e-9:
+                    return None
+                points.append((x / z, y / z))
+        corners = utils.order_points(np.array(points, dtype=np.float32))
+        
+        # Reject intersections far outside the frame and tiny quads
+        margin = 0.1 * max(h, w)
+        if (corners[:, 0].min() < -margin or corners[:, 0].max() > w + margin or
+                corners[:, 1].min() < -margin or corners[:, 1].max() > h + margin):
+            return None
+        if (not utils.validate_quadrilateral(corners) or
+                cv2.contourArea(corners) <= constants.MIN_DOCUMENT_AREA):
+            return None
+        
+        return corners
+    
     def apply_perspective_transform(
         self,
         image: np.ndarray,
@@ -136,20 +267,15 @@ class DocumentScanner:
         """
         # Order the corners
         rect = utils.order_points(corners)
-        (tl, tr, br, bl) = rect
-        
-        # Calculate width and height of the document
-        width_a = utils.calculate_distance((br[0], br[1]), (bl[0], bl[1]))
-        width_b = utils.calculate_distance((tr[0], tr[1]), (tl[0], tl[1]))
-        max_width = max(int(width_a), int(width_b))
         
-        height_a = utils.calculate_distance((tr[0], tr[1]), (br[0], br[1]))
-        height_b = utils.calculate_distance((tl[0], tl[1]), (bl[0], bl[1]))
-        max_height = max(int(height_a), int(height_b))
-        
-        # Use provided output size or calculated dimensions
+        # Use provided output size or the document's longer side lengths
         if output_size:
             max_width, max_height = output_size
+        else:
+            # Side lengths in TL->TR->BR->BL->TL order
+            side_lens = utils.quad_side_lengths(rect)
+            max_width = int(max(side_lens[0], side_lens[2]))
+            max_height = int(max(side_lens[1], side_lens[3]))
         
         # Define destination points for the perspective transform
         dst = np.array([
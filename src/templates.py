@@ -1,5 +1,8 @@
 """Document templates and presets for common document types"""
 
+import hashlib
+import threading
+from collections import OrderedDict
 import cv2
 import numpy as np
 from typing import Tuple, Dict, Any
@@ -32,20 +35,26 @@ class DocumentTemplate:
         Returns:
             Processed image
         """
-        result = image.copy()
+        # Every step below allocates its own output, so the input is only
+        # copied if none of them run
+        result = image
         
         # Resize to template size
         if self.settings.get('resize', True):
-            result = cv2.resize(result, self.size, interpolation=cv2.INTER_CUBIC)
+            h, w = result.shape[:2]
+            tw, th = self.size
+            if (w, h) != (tw, th):
+                # INTER_AREA avoids ringing on downscales; cubic for upscales
+                interp = self.settings.get('resize_interp')
+                if interp is None:
+                    interp = cv2.INTER_AREA if tw * th < w * h else cv2.INTER_CUBIC
+                result = cv2.resize(result, self.size, interpolation=interp)
         
-        # Apply color mode
+        # Apply color mode. Black and white output is thresholded last so
+        # contrast, sharpening and denoising work on the single-channel
+        # gray image rather than on an already binary one
         color_mode = self.settings.get('color_mode', 'color')
-        if color_mode == 'bw':
-            result = ImageProcessor.convert_to_bw(
-                result,
-                threshold_method=self.settings.get('threshold_method', 'adaptive')
-            )
-        elif color_mode == 'grayscale':
+        if color_mode in ('bw', 'grayscale'):
             if len(result.shape) == 3:
                 result = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
         
@@ -64,12 +73,24 @@ class DocumentTemplate:
             strength = self.settings.get('denoise_strength', 5)
             result = ImageProcessor.remove_noise(result, strength=strength)
         
-        # Apply brightness/contrast adjustments
+        if color_mode == 'bw':
+            result = ImageProcessor.convert_to_bw(
+                result,
+                threshold_method=self.settings.get('threshold_method', 'adaptive')
+            )
+        
+        if result is image:
+            result = image.copy()
+        
+        # Apply brightness/contrast adjustments in place on our own buffer
         brightness = self.settings.get('brightness', 0)
         contrast = self.settings.get('contrast', 0)
         if brightness != 0 or contrast != 0:
-            result = ImageProcessor.adjust_brightness_contrast(
-                result, brightness=brightness, contrast=contrast
+            result = cv2.convertScaleAbs(
+                result,
+                dst=result,
+                alpha=1 + contrast / 100.0,
+                beta=brightness
             )
         
         return result
@@ -78,6 +99,13 @@ class DocumentTemplate:
 class TemplateManager:
     """Manager for document templates"""
     
+    # Recent apply_template results, for previewing several templates on the
+    # same image; off by default since each entry is a full-size image
+    cache_enabled = False
+    CACHE_SIZE = 8
+    _cache: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+    _cache_lock = threading.Lock()
+    
     # Predefined templates
     TEMPLATES = {
         'receipt': DocumentTemplate(
@@ -273,10 +301,47 @@ class TemplateManager:
             template_name: Name of the template to apply
             
         Returns:
-            Processed image
+            Processed image (read-only when cache_enabled is set)
         """
         template = cls.get_template(template_name)
-        return template.apply(image)
+        if not cls.cache_enabled:
+            return template.apply(image)
+        
+        # Hash every byte: a sparse sample could miss a small edit and
+        # return a stale result
+        data = np.ascontiguousarray(image)
+        digest = hashlib.sha1(memoryview(data).cast('B')).digest()
+        # Key on what the template does, not its name, so edited settings
+        # or a replaced template never hit an old entry
+        key = (
+            template.size,
+            tuple(sorted(template.settings.items())),
+            data.shape,
+            data.dtype.str,
+            digest
+        )
+        
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached is not None:
+                cls._cache.move_to_end(key)
+                return cached
+        
+        result = template.apply(image)
+        result.flags.writeable = False
+        
+        with cls._cache_lock:
+            cls._cache[key] = result
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        
+        return result
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached apply_template results"""
+        with cls._cache_lock:
+            cls._cache.clear()
     
     @classmethod
     def create_custom_template(
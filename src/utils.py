@@ -1,11 +1,90 @@
 """Utility functions for document scanner"""
 
+import io
+import math
+import os
+import threading
 import cv2
 import numpy as np
+from functools import lru_cache
+from PIL import Image
 from typing import Tuple, Optional, List
 
 
-def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 1500) -> np.ndarray:
+# Images at least this large are resized on a CUDA device when one is
+# present; below it the upload and download cost more than they save
+CUDA_RESIZE_MIN_PIXELS = 4_000_000
+
+# Longest over shortest side allowed by validate_quadrilateral
+MAX_QUAD_EDGE_RATIO = 10
+
+# Per-thread device buffers for resize_image, reused across calls
+_gpu = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _cuda_resize_available() -> bool:
+    """Check for a CUDA device and cv2.cuda.resize (probed on first use)"""
+    try:
+        return hasattr(cv2.cuda, 'resize') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+@lru_cache(maxsize=1)
+def opencl_available() -> bool:
+    """Check whether OpenCV can run UMat operations through OpenCL"""
+    return cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
+
+def to_host(image) -> np.ndarray:
+    """Download a UMat result; NumPy arrays pass through"""
+    return image.get() if isinstance(image, cv2.UMat) else image
+
+
+# CLAHE objects keep internal buffers between apply() calls, so each
+# thread gets its own, keyed by clip limit
+_clahe_local = threading.local()
+
+
+def get_clahe(clip_limit: float):
+    """Get a cached CLAHE object (8x8 tiles) for this thread"""
+    cache = getattr(_clahe_local, 'cache', None)
+    if cache is None:
+        cache = _clahe_local.cache = {}
+    clahe = cache.get(clip_limit)
+    if clahe is None:
+        clahe = cache[clip_limit] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+    return clahe
+
+
+# Per-thread intermediates reused across calls (e.g. a batch of pages)
+_scratch = threading.local()
+
+
+def scratch_buffer(name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    """
+    Get a reusable per-thread buffer (contents are undefined).
+    
+    Only for intermediates: never return a scratch buffer to the caller.
+    
+    Args:
+        name: Buffer name, one per use site
+        shape: Required shape
+        dtype: Required dtype
+        
+    Returns:
+        Buffer of the requested shape and dtype
+    """
+    buf = getattr(_scratch, name, None)
+    if buf is None or buf.shape != shape or buf.dtype != dtype:
+        buf = np.empty(shape, dtype=dtype)
+        setattr(_scratch, name, buf)
+    return buf
+
+
+def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 1500,
+                 dst: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Resize image while maintaining aspect ratio.
     
@@ -13,6 +92,8 @@ def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 150
         image: Input image
         max_width: Maximum width
         max_height: Maximum height
+        dst: Optional output buffer of the resized shape and image dtype,
+             reused instead of allocating (e.g. across camera frames)
         
     Returns:
         Resized image
@@ -27,7 +108,40 @@ def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 150
     new_width = int(width * scale)
     new_height = int(height * scale)
     
-    return cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    interpolation = resize_interpolation(scale)
+    if height * width >= CUDA_RESIZE_MIN_PIXELS and _cuda_resize_available():
+        return _cuda_resize(image, (new_width, new_height), interpolation, dst)
+    
+    return cv2.resize(image, (new_width, new_height), dst=dst,
+                      interpolation=interpolation)
+
+
+def _cuda_resize(image: np.ndarray, size: Tuple[int, int], interpolation: int,
+                 dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """cv2.resize on the CUDA device, through this thread's reused GpuMats"""
+    if getattr(_gpu, 'src', None) is None:
+        _gpu.src = cv2.cuda_GpuMat()
+        _gpu.dst = cv2.cuda_GpuMat()
+    _gpu.src.upload(image)
+    cv2.cuda.resize(_gpu.src, size, _gpu.dst, interpolation=interpolation)
+    return _gpu.dst.download() if dst is None else _gpu.dst.download(dst)
+
+
+def resize_interpolation(scale: float) -> int:
+    """
+    Pick the interpolation for a downscale by the given factor.
+    
+    INTER_AREA only pays off once several source pixels fall into each
+    output pixel; above half size INTER_LINEAR looks the same and is
+    several times faster.
+    
+    Args:
+        scale: Output size over input size (below 1)
+        
+    Returns:
+        OpenCV interpolation flag
+    """
+    return cv2.INTER_AREA if scale < 0.5 else cv2.INTER_LINEAR
 
 
 def order_points(pts: np.ndarray) -> np.ndarray:
@@ -40,22 +154,37 @@ def order_points(pts: np.ndarray) -> np.ndarray:
     Returns:
         Ordered array of points
     """
-    # Initialize ordered coordinates
-    rect = np.zeros((4, 2), dtype="float32")
+    pts = np.asarray(pts, dtype=np.float32)
     
-    # Top-left point has smallest sum
-    # Bottom-right has largest sum
-    s = pts.sum(axis=1)
-    rect[0] = pts[np.argmin(s)]
-    rect[2] = pts[np.argmax(s)]
+    # Top-left point has smallest sum, bottom-right the largest;
+    # top-right has smallest difference (y - x), bottom-left the largest
+    s = pts[:, 0] + pts[:, 1]
+    diff = pts[:, 1] - pts[:, 0]
     
-    # Top-right has smallest difference
-    # Bottom-left has largest difference
-    diff = np.diff(pts, axis=1)
-    rect[1] = pts[np.argmin(diff)]
-    rect[3] = pts[np.argmax(diff)]
+    # One gather builds the ordered copy
+    return pts[[s.argmin(), diff.argmin(), s.argmax(), diff.argmax()]]
+
+
+def order_points_batch(pts: np.ndarray) -> np.ndarray:
+    """
+    Order the corners of many quadrilaterals at once (see order_points).
     
-    return rect
+    Args:
+        pts: Array of shape (N, 4, 2), e.g. one quad per video frame
+        
+    Returns:
+        Ordered array of shape (N, 4, 2)
+    """
+    pts = np.asarray(pts, dtype=np.float32)
+    s = pts[:, :, 0] + pts[:, :, 1]
+    diff = pts[:, :, 1] - pts[:, :, 0]
+    
+    # Per quad: TL, TR, BR, BL indices, then one gather for all N
+    idx = np.stack(
+        [s.argmin(axis=1), diff.argmin(axis=1), s.argmax(axis=1), diff.argmax(axis=1)],
+        axis=1
+    )
+    return np.take_along_axis(pts, idx[:, :, None], axis=1)
 
 
 def calculate_distance(pt1: Tuple[float, float], pt2: Tuple[float, float]) -> float:
@@ -69,7 +198,23 @@ def calculate_distance(pt1: Tuple[float, float], pt2: Tuple[float, float]) -> fl
     Returns:
         Distance between points
     """
-    return np.sqrt((pt1[0] - pt2[0])**2 + (pt1[1] - pt2[1])**2)
+    return math.hypot(pt1[0] - pt2[0], pt1[1] - pt2[1])
+
+
+def quad_side_lengths(pts: np.ndarray) -> np.ndarray:
+    """
+    Lengths of a quadrilateral's four sides, in one vectorized pass.
+    
+    Args:
+        pts: Array of 4 points in order around the quad (e.g. from
+             order_points)
+        
+    Returns:
+        Array of the 4 side lengths, side i running from point i to i+1
+    """
+    pts = np.asarray(pts, dtype=np.float32).reshape(4, 2)
+    d = np.roll(pts, -1, axis=0) - pts
+    return np.hypot(d[:, 0], d[:, 1])
 
 
 def validate_quadrilateral(approx: np.ndarray) -> bool:
@@ -85,23 +230,68 @@ def validate_quadrilateral(approx: np.ndarray) -> bool:
     if len(approx) != 4:
         return False
     
-    # Check if all angles are reasonable (not too acute)
-    # This helps filter out false detections
-    return True
+    pts = np.asarray(approx, dtype=np.float32).reshape(4, 2)
+    edges = np.roll(pts, -1, axis=0) - pts
+    
+    # Convex and not self-intersecting: consecutive edges all turn the
+    # same way (z of each edge's cross product with the next)
+    nxt = np.roll(edges, -1, axis=0)
+    turns = edges[:, 0] * nxt[:, 1] - edges[:, 1] * nxt[:, 0]
+    if not (np.all(turns > 0) or np.all(turns < 0)):
+        return False
+    
+    # Reject degenerate slivers
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    return lengths.max() <= MAX_QUAD_EDGE_RATIO * lengths.min()
 
 
-def load_image(filepath: str) -> Optional[np.ndarray]:
+def _reduced_read_flag(data: np.ndarray, target_max_dim: int) -> int:
+    """
+    Pick the largest IMREAD_REDUCED_COLOR_* factor that keeps a JPEG's
+    long side at or above target_max_dim.
+    
+    The JPEG decoder scales these down in the DCT domain, skipping most of
+    the decode work. Other formats get no such benefit and load at full size.
+    """
+    if data.size < 2 or data[0] != 0xFF or data[1] != 0xD8:
+        return cv2.IMREAD_COLOR
+    # Pillow reads only the header to get the size; if it cannot parse it,
+    # leave the decode to OpenCV at full size
+    try:
+        with Image.open(io.BytesIO(data)) as header:
+            ratio = max(header.size) / target_max_dim
+    except (OSError, ValueError, SyntaxError):
+        return cv2.IMREAD_COLOR
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                         (4, cv2.IMREAD_REDUCED_COLOR_4),
+                         (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if ratio >= factor:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def load_image(filepath: str, target_max_dim: Optional[int] = None) -> Optional[np.ndarray]:
     """
     Load image from file path.
     
     Args:
         filepath: Path to image file
+        target_max_dim: If given, JPEGs may be decoded at 1/2, 1/4 or 1/8
+                        scale, as long as the long side stays at least this
+                        large (resize afterwards for an exact size). Leave
+                        unset when full resolution is needed
         
     Returns:
         Loaded image or None if failed
     """
     try:
-        image = cv2.imread(filepath)
+        # Read the bytes ourselves and decode from memory: one plain read,
+        # and unlike imread it also opens non-ASCII paths on Windows
+        data = np.fromfile(filepath, dtype=np.uint8)
+        flag = cv2.IMREAD_COLOR
+        if target_max_dim and data.size:
+            flag = _reduced_read_flag(data, target_max_dim)
+        image = cv2.imdecode(data, flag) if data.size else None
         if image is None:
             print(f"Failed to load image: {filepath}")
             return None
@@ -111,38 +301,64 @@ def load_image(filepath: str) -> Optional[np.ndarray]:
         return None
 
 
-def save_image(image: np.ndarray, filepath: str) -> bool:
+def save_image(image: np.ndarray, filepath: str, jpeg_quality: int = 90,
+               png_compression: Optional[int] = None) -> bool:
     """
     Save image to file.
     
     Args:
         image: Image to save
-        filepath: Output file path
+        filepath: Output file path (the extension selects the format)
+        jpeg_quality: JPEG quality (0-100)
+        png_compression: PNG zlib level (0-9). None keeps OpenCV's
+                         default (level 1 with RLE), which is faster than
+                         any explicit level
         
     Returns:
         True if successful
     """
     try:
-        cv2.imwrite(filepath, image)
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext in ('.jpg', '.jpeg'):
+            params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        elif ext == '.png' and png_compression is not None:
+            params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        else:
+            params = []
+        
+        # Encode in memory and write the bytes directly, which (like
+        # load_image) also handles non-ASCII paths on Windows
+        ok, buf = cv2.imencode(ext, image, params)
+        if not ok:
+            print(f"Failed to save image: {filepath}")
+            return False
+        buf.tofile(filepath)
         return True
     except Exception as e:
         print(f"Error saving image: {e}")
         return False
 
 
-def convert_to_grayscale(image: np.ndarray) -> np.ndarray:
+def convert_to_grayscale(image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Convert image to grayscale.
     
     Args:
-        image: Input image
+        image: Input image (gray, single-channel HxWx1, BGR or BGRA)
+        dst: Optional output buffer of shape HxW, reused instead of
+             allocating
         
     Returns:
-        Grayscale image
+        Grayscale image (the input itself, or a view of it, if already
+        single-channel)
     """
-    if len(image.shape) == 3:
-        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    return image
+    if image.ndim == 2:
+        return image
+    channels = image.shape[2]
+    if channels == 1:
+        return image[:, :, 0]
+    code = cv2.COLOR_BGRA2GRAY if channels == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code, dst=dst)
 
 
 def get_image_dimensions(image: np.ndarray) -> Tuple[int, int]:
@@ -155,5 +371,6 @@ def get_image_dimensions(image: np.ndarray) -> Tuple[int, int]:
     Returns:
         Tuple of (width, height)
     """
-    height, width = image.shape[:2]
-    return width, height
+    # One shape lookup, no slice
+    shape = image.shape
+    return shape[1], shape[0]
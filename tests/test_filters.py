@@ -49,11 +49,8 @@ class TestImageFilters(unittest.TestCase):
         result = ImageFilters.invert(self.color_image)
         self.assertIsInstance(result, np.ndarray)
         self.assertEqual(result.shape, self.color_image.shape)
-        # Inverted values should sum to 255
-        np.testing.assert_array_almost_equal(
-            self.color_image + result,
-            np.full_like(self.color_image, 255)
-        )
+        # Inverted values should sum to 255 (exact, so compare as integers)
+        np.testing.assert_array_equal(result, 255 - self.color_image)
     
     def test_posterize_filter(self):
         """Test posterize filter"""
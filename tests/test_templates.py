@@ -15,13 +15,14 @@ from src.templates import TemplateManager, DocumentTemplate
 class TestDocumentTemplates(unittest.TestCase):
     """Test document template functionality"""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test fixtures"""
         # Create a test image (white image with some noise)
-        self.test_image = np.ones((500, 500, 3), dtype=np.uint8) * 255
-        # Add some random noise
-        noise = np.random.randint(0, 50, (500, 500, 3), dtype=np.uint8)
-        self.test_image = cv2.subtract(self.test_image, noise)
+        rng = np.random.default_rng(0)
+        noise = rng.integers(0, 50, (500, 500, 3), dtype=np.uint8)
+        cls.test_image = cv2.subtract(np.full((500, 500, 3), 255, dtype=np.uint8), noise)
+        cls.test_image.flags.writeable = False
     
     def test_get_template_names(self):
         """Test getting available template names"""